@@ -1,12 +1,25 @@
 """Main module for gtkpass."""
 
+import sys
+
 
 def main():
-    """Entry point for gtkpass."""
+    """Entry point for gtkpass.
+
+    Query sub-commands (``ls``, ``find``, ``show``) are answered by the
+    headless command line interface; anything else starts the application.
+    """
+    from gtkpass.cli import COMMANDS
+
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        from gtkpass.cli import main as cli_main
+
+        return cli_main(sys.argv[1:])
+
     from gtkpass.app import main as app_main
 
     return app_main()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,14 +1,32 @@
 """Main GTKPass application class."""
 
+import logging
 import sys
 from typing import Optional
 
 import gi
 
 gi.require_version("Gtk", "4.0")
+gi.require_version("Gdk", "4.0")
 gi.require_version("Adw", "1")
 
-from gi.repository import Adw, Gio, Gtk  # noqa: E402
+from gi.repository import Adw, Gdk, Gio, GLib, Gtk  # noqa: E402
+
+from gtkpass.search_provider import SearchProvider  # noqa: E402
+from gtkpass.services.background import BackgroundService  # noqa: E402
+from gtkpass.services.frecency import FrecencyService  # noqa: E402
+from gtkpass.services.stores import (  # noqa: E402
+    MultiStoreService,
+    load_store_configs,
+)
+
+logger = logging.getLogger(__name__)
+
+CLIPBOARD_HOLD_SECONDS = 45
+"""How long a copied password stays on the clipboard (REQ-SEC-008)"""
+
+WARM_ENTRIES = 20
+"""Number of most used entries read ahead at startup"""
 
 
 class GTKPassApp(Adw.Application):
@@ -18,10 +36,26 @@ class GTKPassApp(Adw.Application):
         """Initialize the application."""
         super().__init__(
             application_id="io.github.ronnypfannschmidt.GTKPass",
-            flags=Gio.ApplicationFlags.FLAGS_NONE,
+            flags=Gio.ApplicationFlags.HANDLES_COMMAND_LINE,
             **kwargs,
         )
+        self._setup_options()
         self.window: Optional[Gtk.ApplicationWindow] = None
+        self.stores = MultiStoreService(
+            load_store_configs(), metadata=True, check_keys=True
+        )
+        self.stores.add_listener(self._on_store_refreshed)
+        self.frecency = FrecencyService()
+        self.stores.index.ranking = self.frecency.key
+        self.background = BackgroundService()
+        self._clipboard_generation = 0
+        self._window_refresh_pending = False
+        self.search_provider = SearchProvider(
+            self.stores.index,
+            on_activate=self.show_entry,
+            on_launch_search=self._on_launch_search,
+            application=self,
+        )
 
     def do_activate(self):
         """Activate the application."""
@@ -32,10 +66,171 @@ class GTKPassApp(Adw.Application):
             self.window = GTKPassWindow(application=self)
         self.window.present()
 
+    def do_command_line(self, command_line: Gio.ApplicationCommandLine):
+        """Handle a command line, possibly forwarded from a second instance.
+
+        Second invocations hand their arguments to the running instance over
+        D-Bus and exit as soon as this method returns, so slow work such as
+        decryption is moved to the background.
+        """
+        options = command_line.get_options_dict().end().unpack()
+        if "show" in options:
+            self.show_entry(options["show"])
+        elif "copy" in options:
+            self.copy_entry(options["copy"])
+        else:
+            self.activate()
+        return 0
+
     def do_startup(self):
         """Initialize application on startup."""
         Adw.Application.do_startup(self)
         self._setup_actions()
+        self.background.__enter__()
+        self.stores.__enter__()
+        for future in self.stores.refresh():
+            future.add_done_callback(self._on_scan_done)
+        self.stores.warm(self.frecency.top(WARM_ENTRIES))
+
+    def do_shutdown(self):
+        """Release services on shutdown.
+
+        Every service is released even if persisting a store fails.
+        """
+        try:
+            self.stores.__exit__(None, None, None)
+        finally:
+            try:
+                self.background.__exit__(None, None, None)
+                self.frecency.__exit__(None, None, None)
+            finally:
+                Adw.Application.do_shutdown(self)
+
+    def do_dbus_register(self, connection: Gio.DBusConnection, object_path: str):
+        """Export the GNOME Shell search provider next to the application."""
+        self.search_provider.register(connection, object_path)
+        return Adw.Application.do_dbus_register(self, connection, object_path)
+
+    def do_dbus_unregister(self, connection: Gio.DBusConnection, object_path: str):
+        """Remove the search provider from the bus."""
+        self.search_provider.unregister()
+        Adw.Application.do_dbus_unregister(self, connection, object_path)
+
+    def _on_scan_done(self, future):
+        """Report a failed store scan."""
+        if future.exception() is not None:
+            logger.error(f"Scanning a password store failed: {future.exception()}")
+
+    def _on_sync_action(self, action: Gio.SimpleAction, param):
+        """Pull all stores under git; the index is updated incrementally."""
+        for future in self.stores.sync():
+            future.add_done_callback(self._on_sync_done)
+
+    def _on_sync_done(self, future):
+        """Report a failed pull."""
+        if future.exception() is not None:
+            logger.error(f"Pulling a password store failed: {future.exception()}")
+
+    def _on_store_refreshed(self, name: Optional[str]):
+        """Hand the merged index to the window on the main thread.
+
+        Notifications arriving before the window was updated are coalesced.
+        """
+        if not self._window_refresh_pending:
+            self._window_refresh_pending = True
+            GLib.idle_add(self._refresh_window)
+
+    def _refresh_window(self):
+        """Show the indexed entries in the window, if it exists."""
+        self._window_refresh_pending = False
+        if self.window is not None:
+            self.window.refresh()
+        return GLib.SOURCE_REMOVE
+
+    def show_entry(self, path: str):
+        """Present the window with the given entry selected.
+
+        Args:
+            path: Path of the entry, e.g. ``team:work/github``; paths without
+                a store prefix refer to the primary store.
+        """
+        path = self.stores.qualify(path)
+        self.activate()
+        self.window.show_entry(path)
+        self.frecency.record(path, "open")
+
+    def _on_launch_search(self, terms: list[str]):
+        """Continue a shell search in the application window."""
+        self.activate()
+        self.window.search_entry.set_text(" ".join(terms))
+
+    def _setup_options(self):
+        """Register the command line options understood by the application."""
+        self.add_main_option(
+            "show",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.STRING,
+            "Open the window with an entry selected",
+            "PATH",
+        )
+        self.add_main_option(
+            "copy",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.STRING,
+            "Copy the password of an entry to the clipboard",
+            "PATH",
+        )
+
+    def copy_entry(self, path: str):
+        """Decrypt an entry in the background and copy its password.
+
+        The application is held until the clipboard hold time has passed,
+        as the clipboard content is lost once the owning process exits.
+        The clipboard is then cleared unless something else was copied
+        meanwhile.
+
+        Args:
+            path: Qualified path of the entry, e.g. ``team:work/github``.
+        """
+        self.hold()
+        self.frecency.record(self.stores.qualify(path), "copy")
+        future = self.background.submit(self.stores.get_password, path)
+        future.add_done_callback(
+            lambda f: GLib.idle_add(self._on_password_decrypted, path, f)
+        )
+
+    def _on_password_decrypted(self, path: str, future):
+        """Put a decrypted password on the clipboard on the main thread."""
+        if future.exception() is not None:
+            logger.error(f"Failed to copy {path}: {future.exception()}")
+            self.release()
+            return GLib.SOURCE_REMOVE
+        password = future.result()
+        self._clipboard().set(password.password)
+        password.clear()
+        self._clipboard_generation += 1
+        GLib.timeout_add_seconds(
+            CLIPBOARD_HOLD_SECONDS, self._release_clipboard, self._clipboard_generation
+        )
+        return GLib.SOURCE_REMOVE
+
+    def _clipboard(self) -> Gdk.Clipboard:
+        """Return the clipboard of the default display."""
+        return Gdk.Display.get_default().get_clipboard()
+
+    def _release_clipboard(self, generation: int):
+        """Clear a copied password and drop the hold taken for it.
+
+        The clipboard is only cleared if it still holds the password of this
+        copy, not a later copy or content from another application.
+        """
+        clipboard = self._clipboard()
+        if generation == self._clipboard_generation and clipboard.is_local():
+            clipboard.set_content(None)
+        self.release()
+        return GLib.SOURCE_REMOVE
 
     def _setup_actions(self):
         """Set up application actions."""
@@ -45,6 +240,17 @@ class GTKPassApp(Adw.Application):
         self.add_action(quit_action)
         self.set_accels_for_action("app.quit", ["<Control>q"])
 
+        # Refresh action
+        refresh_action = Gio.SimpleAction.new("refresh", None)
+        refresh_action.connect("activate", lambda *_: self.stores.refresh())
+        self.add_action(refresh_action)
+        self.set_accels_for_action("app.refresh", ["<Control>r"])
+
+        # Sync action
+        sync_action = Gio.SimpleAction.new("sync", None)
+        sync_action.connect("activate", self._on_sync_action)
+        self.add_action(sync_action)
+
         # About action
         about_action = Gio.SimpleAction.new("about", None)
         about_action.connect("activate", self._on_about_action)
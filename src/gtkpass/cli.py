@@ -0,0 +1,101 @@
+"""Headless command line interface for GTKPass.
+
+The commands in this module answer queries straight from the password store
+for scripting and shell completion. This module and everything it imports
+must stay free of GTK (``gi``) imports to keep startup in the millisecond
+range.
+"""
+
+import argparse
+import json
+import sys
+from typing import Optional, Sequence
+
+from gtkpass.services.frecency import FrecencyService
+from gtkpass.services.gpg import GPGError
+from gtkpass.services.stores import MultiStoreService, load_store_configs
+
+COMMANDS = ("ls", "find", "show")
+"""Sub-commands handled by the command line interface"""
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for the sub-commands."""
+    parser = argparse.ArgumentParser(
+        prog="gtkpass",
+        description="Query the password store without starting the GUI.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ls = commands.add_parser("ls", help="list all entries")
+    ls.add_argument("--json", action="store_true", help="output JSON")
+
+    find = commands.add_parser("find", help="find entries matching all terms")
+    find.add_argument("terms", nargs="+", help="search terms")
+    find.add_argument("--json", action="store_true", help="output JSON")
+
+    show = commands.add_parser("show", help="decrypt an entry")
+    show.add_argument("path", help="store path, e.g. work/github or team:vpn")
+    show.add_argument(
+        "--json",
+        action="store_true",
+        help="output the entry metadata as JSON (never includes the password)",
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run a command line query.
+
+    Args:
+        argv: Command line arguments without the program name.
+
+    Returns:
+        The process exit status.
+    """
+    args = _build_parser().parse_args(argv)
+    stores = MultiStoreService(load_store_configs())
+    frecency = FrecencyService()
+    stores.index.ranking = frecency.key
+
+    if args.command == "show":
+        try:
+            password = stores.get_password(args.path)
+        except FileNotFoundError:
+            print(
+                f"gtkpass: {args.path} is not in the password store",
+                file=sys.stderr,
+            )
+            return 1
+        except GPGError as e:
+            print(f"gtkpass: failed to decrypt {args.path}: {e}", file=sys.stderr)
+            return 1
+        try:
+            if args.json:
+                print(json.dumps(password.to_dict()))
+            else:
+                print(password.password)
+        finally:
+            password.clear()
+        with frecency:
+            frecency.record(stores.qualify(args.path), "open")
+        return 0
+
+    status = 0
+    with stores:
+        for store, future in zip(stores.stores.values(), stores.refresh()):
+            try:
+                future.result()
+            except OSError as e:
+                name = store.name or store.store_path
+                print(f"gtkpass: failed to read store {name}: {e}", file=sys.stderr)
+                status = 1
+    terms = args.terms if args.command == "find" else []
+    entries = [stores.index.get(path) for path in stores.index.search(terms)]
+
+    if args.json:
+        print(json.dumps([entry.to_dict() for entry in entries]))
+    else:
+        for entry in entries:
+            print(entry.qualified_path)
+    return status
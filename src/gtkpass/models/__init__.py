@@ -1,5 +1,6 @@
 """Data models for GTKPass."""
 
+from gtkpass.models.key import GPGKey
 from gtkpass.models.password import Password, PasswordEntry
 
-__all__ = ["Password", "PasswordEntry"]
+__all__ = ["GPGKey", "Password", "PasswordEntry"]
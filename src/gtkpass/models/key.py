@@ -0,0 +1,91 @@
+"""GPG key data model.
+
+This module defines the data structures describing keys in the keyring.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+UNUSABLE_VALIDITY = frozenset("erdi")
+"""Validity flags of expired, revoked, disabled and invalid keys"""
+
+TRUSTED_VALIDITY = frozenset("uf")
+"""Validity flags of ultimately and fully valid keys"""
+
+
+@dataclass
+class GPGKey:
+    """Represents a public key from the keyring.
+
+    Built from the machine readable ``gpg --with-colons`` listing.
+    """
+
+    fingerprint: str
+    """Fingerprint of the primary key"""
+
+    key_id: str
+    """Long key ID of the primary key"""
+
+    uids: list[str] = field(default_factory=list)
+    """User IDs, e.g. ``Alice <alice@example.com>``"""
+
+    subkeys: list[str] = field(default_factory=list)
+    """Fingerprints of the subkeys"""
+
+    validity: str = ""
+    """Validity flag from the listing, e.g. ``u`` (ultimate) or ``e`` (expired)"""
+
+    expires: Optional[datetime] = None
+    """Expiry of the primary key; None if it never expires"""
+
+    can_encrypt: bool = False
+    """Whether the key has a usable encryption (sub)key"""
+
+    encryption_expires: Optional[datetime] = None
+    """Latest expiry of the usable encryption (sub)keys; None if never"""
+
+    @property
+    def usable_until(self) -> Optional[datetime]:
+        """When encryption to the key stops working; None if never.
+
+        That is the earlier of the primary key's and the encryption keys'
+        expiry, as gpg refuses a key once its primary key has expired.
+        """
+        dates = [d for d in (self.expires, self.encryption_expires) if d is not None]
+        return min(dates, default=None)
+
+    @property
+    def usable(self) -> bool:
+        """Whether data can be encrypted to this key."""
+        return self.validity not in UNUSABLE_VALIDITY and self.can_encrypt
+
+    @property
+    def trusted(self) -> bool:
+        """Whether the key is fully or ultimately valid."""
+        return self.validity in TRUSTED_VALIDITY
+
+    def matches(self, recipient: str) -> bool:
+        """Check whether a ``.gpg-id`` recipient specification names this key.
+
+        Recipients may be fingerprints, (short or long) key IDs with an
+        optional ``0x`` prefix or ``!`` suffix, email addresses or parts of
+        a user ID, like gpg accepts them.
+
+        Args:
+            recipient: The recipient specification.
+
+        Returns:
+            True if the recipient refers to this key.
+        """
+        spec = recipient.strip().removesuffix("!")
+        hex_spec = spec.removeprefix("0x").removeprefix("0X").upper()
+        if len(hex_spec) >= 8 and all(c in "0123456789ABCDEF" for c in hex_spec):
+            return any(
+                fingerprint.endswith(hex_spec)
+                for fingerprint in [self.fingerprint, *self.subkeys]
+            )
+        if spec.startswith("<"):
+            email = f"<{spec.strip('<>').lower()}>"
+            return any(email in uid.lower() for uid in self.uids)
+        return any(spec.lower() in uid.lower() for uid in self.uids)
@@ -7,6 +7,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+_METADATA_KEYS = frozenset({"username", "login", "url", "otp"})
+"""Metadata keys recognized in the lines following the password"""
+
 
 @dataclass
 class Password:
@@ -61,6 +64,64 @@ class Password:
             "notes": self.notes,
         }
 
+    def to_passwordstore_format(self) -> str:
+        """Serialize to the passwordstore file format.
+
+        Returns:
+            The password on the first line followed by metadata and notes
+        """
+        lines = [self.password]
+        if self.username:
+            lines.append(f"username: {self.username}")
+        if self.url:
+            lines.append(f"url: {self.url}")
+        if self.otp_secret:
+            lines.append(self.otp_secret)
+        if self.notes:
+            lines.append(self.notes)
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def from_passwordstore_format(
+        cls, content: str, name: str, path: Path
+    ) -> "Password":
+        """Parse the decrypted contents of a passwordstore file.
+
+        The first line is the password, followed by optional ``key: value``
+        metadata lines. Lines that are not recognized metadata are kept as
+        notes.
+
+        Args:
+            content: Decrypted file contents
+            name: Display name of the entry
+            path: Path of the entry in the store
+
+        Returns:
+            The parsed password
+        """
+        password, _, rest = content.partition("\n")
+        fields: dict[str, str] = {}
+        notes = []
+        for line in rest.splitlines():
+            key, sep, value = line.partition(":")
+            key = key.strip().lower()
+            if sep and key in _METADATA_KEYS and key not in fields:
+                fields[key] = value.strip()
+            elif line.startswith("otpauth://") and "otp" not in fields:
+                fields["otp"] = line.strip()
+            else:
+                notes.append(line)
+        note_text = "\n".join(notes).strip()
+        return cls(
+            name=name,
+            path=path,
+            password=password,
+            username=fields.get("username") or fields.get("login"),
+            url=fields.get("url"),
+            notes=note_text or None,
+            otp_secret=fields.get("otp"),
+        )
+
 
 @dataclass
 class PasswordEntry:
@@ -79,6 +140,32 @@ class PasswordEntry:
     subtitle: Optional[str] = None
     """Subtitle to display (username, URL, or path)"""
 
+    store: Optional[str] = None
+    """Name of the store the entry belongs to, if several are configured"""
+
+    @property
+    def qualified_path(self) -> str:
+        """Store-qualified path, e.g. ``team:work/github``.
+
+        Entries of an unnamed store use their plain path.
+        """
+        if self.store is None:
+            return self.path.as_posix()
+        return f"{self.store}:{self.path.as_posix()}"
+
     def __str__(self) -> str:
         """String representation."""
         return f"{self.name} ({self.subtitle or self.path})"
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary representation.
+
+        Returns:
+            Dictionary with the entry data
+        """
+        return {
+            "name": self.name,
+            "path": self.path.as_posix(),
+            "subtitle": self.subtitle,
+            "store": self.store,
+        }
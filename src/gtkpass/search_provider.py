@@ -0,0 +1,172 @@
+"""GNOME Shell search provider for GTKPass.
+
+Exports ``org.gnome.Shell.SearchProvider2`` on the application's D-Bus
+connection. Queries are answered from the already loaded :class:`EntryIndex`
+so no process is spawned and no file is read per keystroke.
+"""
+
+import logging
+from typing import Callable, Optional
+
+from gi.repository import Gio, GLib
+
+from gtkpass.services.index import EntryIndex
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PROVIDER_PATH_SUFFIX = "/SearchProvider"
+"""Object path of the provider relative to the application object path"""
+
+SEARCH_PROVIDER_XML = """
+<node>
+  <interface name="org.gnome.Shell.SearchProvider2">
+    <method name="GetInitialResultSet">
+      <arg type="as" name="terms" direction="in"/>
+      <arg type="as" name="results" direction="out"/>
+    </method>
+    <method name="GetSubsearchResultSet">
+      <arg type="as" name="previous_results" direction="in"/>
+      <arg type="as" name="terms" direction="in"/>
+      <arg type="as" name="results" direction="out"/>
+    </method>
+    <method name="GetResultMetas">
+      <arg type="as" name="identifiers" direction="in"/>
+      <arg type="aa{sv}" name="metas" direction="out"/>
+    </method>
+    <method name="ActivateResult">
+      <arg type="s" name="identifier" direction="in"/>
+      <arg type="as" name="terms" direction="in"/>
+      <arg type="u" name="timestamp" direction="in"/>
+    </method>
+    <method name="LaunchSearch">
+      <arg type="as" name="terms" direction="in"/>
+      <arg type="u" name="timestamp" direction="in"/>
+    </method>
+  </interface>
+</node>
+"""
+
+
+class SearchProvider:
+    """D-Bus object implementing ``org.gnome.Shell.SearchProvider2``.
+
+    Result identifiers are qualified paths such as ``team:work/github``.
+    """
+
+    def __init__(
+        self,
+        index: EntryIndex,
+        on_activate: Optional[Callable[[str], None]] = None,
+        on_launch_search: Optional[Callable[[list[str]], None]] = None,
+        application: Optional[Gio.Application] = None,
+    ):
+        """
+        Initialize the search provider.
+
+        Args:
+            index: The entry index queries are answered from.
+            on_activate: Called with the identifier of an activated result.
+            on_launch_search: Called with the terms when the user asks to
+                continue the search in the application.
+            application: Application kept alive while requests are served.
+        """
+        self._index = index
+        self._on_activate = on_activate
+        self._on_launch_search = on_launch_search
+        self._application = application
+        self._registration_id: Optional[int] = None
+        self._connection: Optional[Gio.DBusConnection] = None
+
+    def get_initial_result_set(self, terms: list[str]) -> list[str]:
+        """Search the whole index."""
+        return self._index.search(terms)
+
+    def get_subsearch_result_set(
+        self, previous_results: list[str], terms: list[str]
+    ) -> list[str]:
+        """Narrow down a previous result set instead of searching everything."""
+        return self._index.search(terms, within=previous_results)
+
+    def get_result_metas(self, identifiers: list[str]) -> list[dict]:
+        """Describe results for display in the shell."""
+        metas = []
+        for identifier in identifiers:
+            entry = self._index.get(identifier)
+            if entry is None:
+                continue
+            metas.append(
+                {
+                    "id": GLib.Variant("s", identifier),
+                    "name": GLib.Variant("s", entry.name),
+                    "description": GLib.Variant(
+                        "s", entry.subtitle or entry.qualified_path
+                    ),
+                }
+            )
+        return metas
+
+    def register(self, connection: Gio.DBusConnection, object_path: str) -> None:
+        """Export the provider on a D-Bus connection.
+
+        Args:
+            connection: The connection to export on.
+            object_path: The application object path; the provider is
+                exported below it at ``SEARCH_PROVIDER_PATH_SUFFIX``.
+        """
+        node = Gio.DBusNodeInfo.new_for_xml(SEARCH_PROVIDER_XML)
+        self._registration_id = connection.register_object(
+            object_path + SEARCH_PROVIDER_PATH_SUFFIX,
+            node.interfaces[0],
+            self._on_method_call,
+            None,
+            None,
+        )
+        self._connection = connection
+        logger.debug("Search provider registered")
+
+    def unregister(self) -> None:
+        """Remove the provider from its D-Bus connection."""
+        if self._connection is not None and self._registration_id is not None:
+            self._connection.unregister_object(self._registration_id)
+        self._connection = None
+        self._registration_id = None
+
+    def _on_method_call(
+        self,
+        connection,
+        sender,
+        object_path,
+        interface_name,
+        method_name,
+        parameters,
+        invocation,
+    ):
+        """Dispatch an incoming D-Bus method call."""
+        if self._application is not None:
+            self._application.hold()
+        try:
+            args = parameters.unpack()
+            if method_name == "GetInitialResultSet":
+                result = GLib.Variant("(as)", (self.get_initial_result_set(*args),))
+            elif method_name == "GetSubsearchResultSet":
+                result = GLib.Variant("(as)", (self.get_subsearch_result_set(*args),))
+            elif method_name == "GetResultMetas":
+                result = GLib.Variant("(aa{sv})", (self.get_result_metas(*args),))
+            elif method_name == "ActivateResult":
+                if self._on_activate is not None:
+                    self._on_activate(args[0])
+                result = None
+            elif method_name == "LaunchSearch":
+                if self._on_launch_search is not None:
+                    self._on_launch_search(args[0])
+                result = None
+            else:
+                invocation.return_dbus_error(
+                    "org.freedesktop.DBus.Error.UnknownMethod",
+                    f"Unknown method {method_name}",
+                )
+                return
+            invocation.return_value(result)
+        finally:
+            if self._application is not None:
+                self._application.release()
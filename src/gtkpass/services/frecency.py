@@ -0,0 +1,214 @@
+"""Frecency ranking service for GTKPass.
+
+Records how often and how recently entries are opened or copied and turns
+that into a time-decayed score. Scores are kept as the base-2 logarithm of
+the score at a fixed reference time: all entries decay by the same factor,
+so the stored value is directly usable as an O(1) sort key and never has to
+be recomputed as time passes.
+"""
+
+import heapq
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Self
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_TIME = 1704067200.0
+"""Epoch seconds (2024-01-01 UTC) that stored scores are relative to"""
+
+DEFAULT_HALF_LIFE = 14 * 24 * 3600.0
+"""Seconds after which a recorded use counts half as much"""
+
+WEIGHTS = {"open": 1.0, "copy": 2.0}
+"""Score added per kind of use"""
+
+SAVE_DELAY = 5.0
+"""Seconds to collect further uses before the database is written"""
+
+MIN_SCORE = 0.01
+"""Entries whose current score dropped below this are forgotten on save"""
+
+
+def database_path() -> Path:
+    """Return the location of the frecency database."""
+    data_home = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(data_home) / "gtkpass" / "frecency.json"
+
+
+def _log2_add(a: float, b: float) -> float:
+    """Return log2(2**a + 2**b) without overflowing."""
+    high, low = max(a, b), min(a, b)
+    if low == -math.inf:
+        return high
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+class FrecencyService:
+    """Service ranking entries by how frequently and recently they are used.
+
+    Example:
+        with FrecencyService() as frecency:
+            frecency.record("work/github", "copy")
+            paths.sort(key=frecency.key, reverse=True)
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        half_life: float = DEFAULT_HALF_LIFE,
+        save_delay: float = SAVE_DELAY,
+    ):
+        """
+        Initialize the frecency service and load the database.
+
+        Args:
+            path: Database file; defaults to :func:`database_path`.
+            half_life: Seconds after which a use counts half as much.
+            save_delay: Seconds to collect further uses before saving.
+        """
+        self.path = path or database_path()
+        self._half_life = half_life
+        self._save_delay = save_delay
+        self._lock = threading.Lock()
+        self._scores: dict[str, float] = {}
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self._load()
+
+    def _load(self) -> None:
+        """Read the database, starting empty if it is missing or corrupt."""
+        try:
+            data = json.loads(self.path.read_text())
+            self._scores = {str(p): float(s) for p, s in data["scores"].items()}
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable frecency database {self.path}: {e}")
+
+    def _exponent(self, now: Optional[float]) -> float:
+        """Return the decay exponent of a point in time."""
+        moment = time.time() if now is None else now
+        return (moment - REFERENCE_TIME) / self._half_life
+
+    def record(self, path: str, kind: str = "open", now: Optional[float] = None):
+        """Record a use of an entry.
+
+        Args:
+            path: Qualified path of the entry, e.g. ``team:work/github``.
+            kind: ``open`` or ``copy``.
+            now: Time of the use in epoch seconds; defaults to now.
+        """
+        increment = math.log2(WEIGHTS[kind]) + self._exponent(now)
+        with self._lock:
+            self._scores[path] = _log2_add(self._scores.get(path, -math.inf), increment)
+            self._schedule_save()
+
+    def forget(self, path: str) -> None:
+        """Drop an entry, e.g. after it was deleted.
+
+        Args:
+            path: Qualified path of the entry.
+        """
+        with self._lock:
+            if self._scores.pop(path, None) is not None:
+                self._schedule_save()
+
+    def key(self, path: str) -> float:
+        """Return the sort key of an entry; higher ranks first.
+
+        Args:
+            path: Qualified path of the entry.
+
+        Returns:
+            The logarithmic score at the reference time; ``-inf`` for
+            entries that were never used.
+        """
+        return self._scores.get(path, -math.inf)
+
+    def score(self, path: str, now: Optional[float] = None) -> float:
+        """Return the current, decayed score of an entry.
+
+        Args:
+            path: Qualified path of the entry.
+            now: Reference time in epoch seconds; defaults to now.
+        """
+        return 2 ** (self.key(path) - self._exponent(now))
+
+    def rank(self, paths: Iterable[str]) -> list[str]:
+        """Order paths by descending score, unused ones by path.
+
+        Args:
+            paths: Qualified paths to order.
+        """
+        return sorted(paths, key=lambda path: (-self.key(path), path))
+
+    def top(self, count: int) -> list[str]:
+        """Return the most used entries.
+
+        Args:
+            count: Maximum number of entries to return.
+        """
+        with self._lock:
+            return heapq.nlargest(count, self._scores, key=self._scores.__getitem__)
+
+    def _schedule_save(self) -> None:
+        """Mark the database dirty and save it after the save delay."""
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self._save_delay, self._save_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _save_in_background(self) -> None:
+        """Save from the timer thread, logging instead of raising."""
+        try:
+            self.save()
+        except OSError as e:
+            logger.error(f"Saving the frecency database failed: {e}")
+
+    def save(self) -> None:
+        """Write the database now if it has unsaved changes."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            threshold = math.log2(MIN_SCORE) + self._exponent(None)
+            self._scores = {p: s for p, s in self._scores.items() if s >= threshold}
+            data = json.dumps({"version": 1, "scores": self._scores})
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as stream:
+                stream.write(data)
+            os.replace(temporary, self.path)
+        except OSError:
+            with self._lock:
+                self._dirty = True
+            raise
+
+    def __enter__(self) -> Self:
+        """Enter the context manager.
+
+        Returns:
+            Self: The service instance.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        """Exit the context manager, saving pending changes.
+
+        Returns:
+            False to propagate exceptions.
+        """
+        self.save()
+        return False
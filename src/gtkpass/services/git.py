@@ -0,0 +1,137 @@
+"""Git service for GTKPass.
+
+This module wraps the ``git`` command line tool for the password store
+repository.
+"""
+
+import logging
+import os
+import signal
+import subprocess
+import threading
+from pathlib import Path
+from typing import Iterable, Optional, Self, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class GitError(Exception):
+    """Raised when a git invocation fails."""
+
+
+class GitService:
+    """Service for running git commands in a password store.
+
+    Example:
+        with GitService(store_path) as git:
+            git.commit("Add work/github", ["work/github.gpg"])
+    """
+
+    def __init__(
+        self, repository: Path, binary: str = "git", wrapper: Sequence[str] = ()
+    ):
+        """
+        Initialize the git service.
+
+        Args:
+            repository: Work tree of the repository (the store root).
+            binary: Name or path of the git executable.
+            wrapper: Command git is run under, e.g. ``("nice", "-n", "19")``.
+        """
+        self.repository = repository
+        self._binary = binary
+        self._wrapper = tuple(wrapper)
+        self._lock = threading.Lock()
+        self._processes: set[subprocess.Popen] = set()
+
+    def is_repository(self) -> bool:
+        """Whether the store is under git version control."""
+        return (self.repository / ".git").exists()
+
+    def run(self, *args: str, check: bool = True) -> str:
+        """Run git in the repository and return its standard output.
+
+        Args:
+            *args: Arguments passed to git.
+            check: Whether a non-zero exit status is an error.
+
+        Returns:
+            The standard output of git.
+
+        Raises:
+            GitError: If git exits with a non-zero status and check is set.
+        """
+        with self._lock:
+            process = subprocess.Popen(
+                [*self._wrapper, self._binary, "-C", str(self.repository), *args],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                start_new_session=True,
+            )
+            self._processes.add(process)
+        try:
+            with process:
+                stdout, stderr = process.communicate()
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+        if check and process.returncode != 0:
+            raise GitError(f"git {args[0]}: {stderr.strip()}")
+        return stdout
+
+    def terminate(self) -> None:
+        """Stop the git commands currently running, with their child processes.
+
+        Git removes its lock and temporary files when it is terminated; the
+        interrupted commands fail with :class:`GitError` if checked.
+        """
+        with self._lock:
+            for process in self._processes:
+                try:
+                    os.killpg(process.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    continue
+
+    def head(self) -> Optional[str]:
+        """Return the commit ID of HEAD, or None for an unborn branch."""
+        output = self.run("rev-parse", "--verify", "--quiet", "HEAD", check=False)
+        return output.strip() or None
+
+    def commit(self, message: str, paths: Iterable[str]) -> bool:
+        """Stage the given paths (including deletions) and commit.
+
+        Args:
+            message: The commit message.
+            paths: Paths relative to the repository to stage.
+
+        Returns:
+            False if there was nothing to commit.
+        """
+        existing, removed = [], []
+        for path in paths:
+            (existing if (self.repository / path).exists() else removed).append(path)
+        if existing:
+            self.run("add", "--", *existing)
+        if removed:
+            self.run("rm", "--cached", "--quiet", "--ignore-unmatch", "--", *removed)
+        if self.run("diff", "--cached", "--name-only").strip() == "":
+            return False
+        self.run("commit", "--quiet", "--message", message)
+        return True
+
+    def __enter__(self) -> Self:
+        """Enter the context manager.
+
+        Returns:
+            Self: The service instance.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        """Exit the context manager.
+
+        Returns:
+            False to propagate exceptions.
+        """
+        return False
@@ -0,0 +1,250 @@
+"""GPG service for GTKPass.
+
+This module wraps the ``gpg`` command line tool. It is deliberately free of
+GTK imports so that it can be used from the headless command line interface.
+"""
+
+import logging
+import os
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Self, Sequence
+
+from gtkpass.models.key import UNUSABLE_VALIDITY, GPGKey
+
+logger = logging.getLogger(__name__)
+
+
+KEYRING_FILES = (
+    "pubring.kbx",
+    "pubring.gpg",
+    "public-keys.d/pubring.db",
+    "trustdb.gpg",
+)
+"""Files in the GnuPG home whose modification means the keyring changed"""
+
+
+class GPGError(Exception):
+    """Raised when a gpg invocation fails."""
+
+
+def keyring_signature(homedir: Path) -> tuple:
+    """Describe the current state of the keyring files in a GnuPG home.
+
+    Args:
+        homedir: The GnuPG home directory.
+
+    Returns:
+        A value that changes whenever a key is imported, changed or removed.
+    """
+    signature = []
+    for name in KEYRING_FILES:
+        try:
+            stat = (homedir / name).stat()
+        except FileNotFoundError:
+            continue
+        signature.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def _timestamp(value: str) -> Optional[datetime]:
+    """Convert a colon listing timestamp (epoch seconds or ISO 8601)."""
+    if not value:
+        return None
+    if "T" in value:
+        return datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+    return datetime.fromtimestamp(int(value), tz=timezone.utc)
+
+
+_SECRET_RECORDS = {"sec": "pub", "ssb": "sub"}
+"""Secret key listing records and their public key listing counterparts"""
+
+
+def parse_colons(listing: str) -> list[GPGKey]:
+    """Parse a ``gpg --with-colons --fixed-list-mode`` key listing.
+
+    Public and secret key listings are both understood.
+
+    Args:
+        listing: The standard output of gpg.
+
+    Returns:
+        The listed keys in listing order.
+    """
+    keys: list[GPGKey] = []
+    # Expiries of the usable encryption keys of each key (None is never)
+    encryption_expiries: list[list[Optional[datetime]]] = []
+    previous = ""
+    for line in listing.splitlines():
+        fields = line.split(":")
+        record = _SECRET_RECORDS.get(fields[0], fields[0])
+        if record == "pub":
+            keys.append(
+                GPGKey(
+                    fingerprint="",
+                    key_id=fields[4],
+                    validity=fields[1],
+                    expires=_timestamp(fields[6]),
+                )
+            )
+            encryption_expiries.append([])
+        elif not keys:
+            continue
+        elif record == "fpr":
+            if previous == "pub":
+                keys[-1].fingerprint = fields[9]
+            elif previous == "sub":
+                keys[-1].subkeys.append(fields[9])
+        elif record == "uid":
+            keys[-1].uids.append(fields[9])
+        if record in ("pub", "sub"):
+            if fields[1] not in UNUSABLE_VALIDITY and "e" in fields[11]:
+                encryption_expiries[-1].append(_timestamp(fields[6]))
+        if record in ("pub", "sub", "fpr", "uid"):
+            previous = record
+
+    for key, expiries in zip(keys, encryption_expiries):
+        key.can_encrypt = bool(expiries)
+        if expiries and None not in expiries:
+            key.encryption_expires = max(expiries)
+    return keys
+
+
+class GPGService:
+    """Service for encrypting and decrypting data with gpg.
+
+    Example:
+        with GPGService() as gpg:
+            content = gpg.decrypt_file(path)
+    """
+
+    def __init__(self, binary: str = "gpg", homedir: Optional[Path] = None):
+        """
+        Initialize the GPG service.
+
+        Args:
+            binary: Name or path of the gpg executable.
+            homedir: Optional GNUPGHOME to use instead of the default.
+        """
+        self._binary = binary
+        self._homedir = homedir
+
+    @property
+    def homedir(self) -> Path:
+        """The GnuPG home directory holding the keyring."""
+        if self._homedir is not None:
+            return self._homedir
+        configured = os.environ.get("GNUPGHOME")
+        return Path(configured) if configured else Path.home() / ".gnupg"
+
+    def _command(self, *args: str) -> list[str]:
+        """Build a gpg command line with the common options."""
+        command = [self._binary, "--batch", "--quiet"]
+        if self._homedir is not None:
+            command += ["--homedir", str(self._homedir)]
+        return command + list(args)
+
+    def run(
+        self, *args: str, input: Optional[bytes] = None, check: bool = True
+    ) -> bytes:
+        """Run gpg and return its standard output.
+
+        Args:
+            *args: Arguments passed to gpg after the common options.
+            input: Optional data written to the standard input of gpg.
+            check: Whether a non-zero exit status is an error.
+
+        Returns:
+            The standard output of gpg.
+
+        Raises:
+            GPGError: If gpg exits with a non-zero status and check is set.
+        """
+        result = subprocess.run(
+            self._command(*args),
+            input=input,
+            capture_output=True,
+        )
+        if check and result.returncode != 0:
+            raise GPGError(result.stderr.decode(errors="replace").strip())
+        return result.stdout
+
+    def decrypt(self, data: bytes) -> str:
+        """Decrypt data.
+
+        Args:
+            data: The encrypted data.
+
+        Returns:
+            The decrypted text.
+        """
+        return self.run("--decrypt", input=data).decode()
+
+    def decrypt_file(self, path: Path) -> str:
+        """Decrypt a file.
+
+        Args:
+            path: Path to the encrypted file.
+
+        Returns:
+            The decrypted text.
+        """
+        return self.decrypt(path.read_bytes())
+
+    def encrypt(self, data: bytes, recipients: Sequence[str]) -> bytes:
+        """Encrypt data for the given recipients.
+
+        Args:
+            data: The plain text data.
+            recipients: Key IDs or fingerprints to encrypt to.
+
+        Returns:
+            The encrypted data.
+        """
+        args = ["--encrypt", "--trust-model", "always"]
+        for recipient in recipients:
+            args += ["--recipient", recipient]
+        return self.run(*args, input=data)
+
+    def list_keys(self, *specs: str) -> list[GPGKey]:
+        """List public keys with a single gpg invocation.
+
+        Args:
+            *specs: Key specifications to list; all keys when omitted.
+
+        Returns:
+            The keys found. Specifications gpg does not know are skipped
+            instead of failing the whole listing.
+        """
+        output = self.run(
+            "--with-colons", "--fixed-list-mode", "--list-keys", *specs, check=False
+        )
+        return parse_colons(output.decode(errors="replace"))
+
+    def list_secret_keys(self) -> list[GPGKey]:
+        """List the keys whose secret part is available, i.e. the user's keys.
+
+        Returns:
+            The secret keys found.
+        """
+        output = self.run(
+            "--with-colons", "--fixed-list-mode", "--list-secret-keys", check=False
+        )
+        return parse_colons(output.decode(errors="replace"))
+
+    def __enter__(self) -> Self:
+        """Enter the context manager.
+
+        Returns:
+            Self: The service instance.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        """Exit the context manager.
+
+        Returns:
+            False to propagate exceptions.
+        """
+        return False
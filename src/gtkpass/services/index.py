@@ -0,0 +1,158 @@
+"""In-memory entry index for GTKPass.
+
+The index keeps the lightweight :class:`PasswordEntry` objects of a store
+together with a lowercased search key, so that queries never touch the
+filesystem.
+"""
+
+import difflib
+import threading
+from typing import Callable, Hashable, Iterable, Optional, Sequence
+
+from gtkpass.models.password import PasswordEntry
+
+
+def _search_key(entry: PasswordEntry) -> str:
+    """Build the lowercased text that search terms are matched against."""
+    parts = [entry.qualified_path]
+    if entry.subtitle:
+        parts.append(entry.subtitle)
+    return "\0".join(parts).lower()
+
+
+def splices(
+    old: Sequence[Hashable], new: Sequence[Hashable]
+) -> list[tuple[int, int, int, int]]:
+    """Compute the list model splices turning one sequence into another.
+
+    Used to update a list model in place, so that items (and the widgets
+    showing them) that did not change are kept.
+
+    Args:
+        old: Keys of the items currently in the model.
+        new: Keys of the items the model should contain.
+
+    Returns:
+        Tuples of the position in the model, the number of items removed
+        there and the start and end of the slice of new inserted instead,
+        last position first so that they can be applied in order.
+    """
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    return [
+        (i1, i2 - i1, j1, j2)
+        for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes())
+        if tag != "equal"
+    ]
+
+
+class EntryIndex:
+    """Searchable index of password entries keyed by their qualified path.
+
+    The index is safe to update from a background thread while it is being
+    queried from the main thread.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[PasswordEntry] = (),
+        ranking: Optional[Callable[[str], float]] = None,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            entries: Initial entries to index.
+            ranking: Optional O(1) sort key of a qualified path; results are
+                ordered by descending key, then by path.
+        """
+        self.ranking = ranking
+        self._lock = threading.Lock()
+        self._entries: dict[str, PasswordEntry] = {}
+        self._keys: dict[str, str] = {}
+        self.replace(entries)
+
+    def __len__(self) -> int:
+        """Number of indexed entries."""
+        return len(self._entries)
+
+    def __contains__(self, path: str) -> bool:
+        """Whether an entry with the given path is indexed."""
+        return path in self._entries
+
+    def get(self, path: str) -> Optional[PasswordEntry]:
+        """Look up an entry by its qualified path.
+
+        Args:
+            path: Qualified path of the entry, e.g. ``work/github``.
+
+        Returns:
+            The entry or None if it is not indexed.
+        """
+        return self._entries.get(path)
+
+    def _sorted(self, paths: Iterable[str]) -> list[str]:
+        """Order paths by ranking (if any), then alphabetically."""
+        ranking = self.ranking
+        if ranking is None:
+            return sorted(paths)
+        return sorted(paths, key=lambda path: (-ranking(path), path))
+
+    def entries(self) -> list[PasswordEntry]:
+        """Return all entries in ranking order."""
+        with self._lock:
+            return [self._entries[path] for path in self._sorted(self._entries)]
+
+    def replace(self, entries: Iterable[PasswordEntry]) -> None:
+        """Replace the indexed entries.
+
+        Args:
+            entries: The new set of entries.
+        """
+        new_entries = {entry.qualified_path: entry for entry in entries}
+        new_keys = {path: _search_key(e) for path, e in new_entries.items()}
+        with self._lock:
+            self._entries = new_entries
+            self._keys = new_keys
+
+    def update(
+        self,
+        added: Iterable[PasswordEntry] = (),
+        removed: Iterable[str] = (),
+    ) -> None:
+        """Apply an incremental change to the index.
+
+        Args:
+            added: Entries that were added or changed.
+            removed: Qualified paths of entries that were removed.
+        """
+        with self._lock:
+            for path in removed:
+                self._entries.pop(path, None)
+                self._keys.pop(path, None)
+            for entry in added:
+                path = entry.qualified_path
+                self._entries[path] = entry
+                self._keys[path] = _search_key(entry)
+
+    def search(
+        self, terms: Iterable[str], within: Optional[Iterable[str]] = None
+    ) -> list[str]:
+        """Find the qualified paths of entries matching all search terms.
+
+        Args:
+            terms: Search terms; each must occur in the entry (case-insensitive).
+            within: Optional paths to restrict the search to, e.g. a previous
+                result set that is being narrowed down.
+
+        Returns:
+            Matching qualified paths in ranking order.
+        """
+        needles = [term.lower() for term in terms if term]
+        with self._lock:
+            keys = self._keys
+            candidates = keys if within is None else (p for p in within if p in keys)
+            return self._sorted(
+                path
+                for path in candidates
+                if all(needle in keys[path] for needle in needles)
+            )
@@ -0,0 +1,201 @@
+"""Key health service for GTKPass.
+
+Checks that the recipients of a password store have usable, trusted keys
+that do not expire soon (REQ-LIFE-012). The whole keyring is listed with a
+single ``gpg --with-colons`` call and kept in a fingerprint-indexed table
+until the keyring files change, so a store-wide check costs one pass over
+the ``.gpg-id`` tree and no further gpg invocations.
+"""
+
+import enum
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Self
+
+from gtkpass.models.key import GPGKey
+from gtkpass.services.gpg import GPGService, keyring_signature
+from gtkpass.services.recipients import RecipientService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WARNING_PERIOD = timedelta(days=30)
+"""How long before expiry a key is reported as expiring"""
+
+
+class KeyProblem(enum.Enum):
+    """Kinds of problems with a recipient key."""
+
+    MISSING = "missing"
+    """No key in the keyring matches the recipient"""
+
+    UNUSABLE = "unusable"
+    """The key is expired, revoked or disabled, or cannot encrypt"""
+
+    EXPIRING = "expiring"
+    """The key or its encryption subkey expires within the warning period"""
+
+    UNTRUSTED = "untrusted"
+    """The key is not fully valid in the web of trust"""
+
+
+@dataclass
+class KeyWarning:
+    """A problem with a recipient key, aggregated over the store."""
+
+    recipient: str
+    """Recipient specification as written in ``.gpg-id``"""
+
+    problem: KeyProblem
+    """What is wrong with the key"""
+
+    key: Optional[GPGKey] = None
+    """The matching key, if there is one"""
+
+    directories: list[str] = field(default_factory=list)
+    """Store directories whose ``.gpg-id`` lists the recipient"""
+
+    @property
+    def expires(self) -> Optional[datetime]:
+        """When encryption to the key stops working, if known."""
+        if self.key is None:
+            return None
+        return self.key.usable_until
+
+
+class KeyHealthService:
+    """Service checking the recipient keys of a password store.
+
+    Example:
+        with KeyHealthService() as health:
+            for warning in health.check(store.recipients):
+                print(warning.recipient, warning.problem.value)
+    """
+
+    def __init__(self, gpg: Optional[GPGService] = None):
+        """
+        Initialize the key health service.
+
+        Args:
+            gpg: GPG service used to list the keyring.
+        """
+        self._gpg = gpg or GPGService()
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._keys: dict[str, GPGKey] = {}
+        self._lookup: dict[str, Optional[GPGKey]] = {}
+
+    def keys(self) -> dict[str, GPGKey]:
+        """Return the keyring indexed by primary key fingerprint.
+
+        The keyring is only listed again when its files have changed.
+        """
+        signature = keyring_signature(self._gpg.homedir)
+        with self._lock:
+            if signature != self._signature:
+                keys = self._gpg.list_keys()
+                self._keys = {key.fingerprint: key for key in keys}
+                self._lookup = {}
+                self._signature = signature
+                logger.debug(f"Loaded {len(keys)} keys from the keyring")
+            return self._keys
+
+    def find(self, recipient: str) -> Optional[GPGKey]:
+        """Find the key a ``.gpg-id`` recipient specification refers to.
+
+        Args:
+            recipient: Fingerprint, key ID, email address or user ID part.
+
+        Returns:
+            The matching key or None.
+        """
+        keys = self.keys()
+        with self._lock:
+            if recipient not in self._lookup:
+                fingerprint = recipient.removeprefix("0x").upper()
+                self._lookup[recipient] = keys.get(fingerprint) or next(
+                    (key for key in keys.values() if key.matches(recipient)), None
+                )
+            return self._lookup[recipient]
+
+    def diagnose(
+        self,
+        recipient: str,
+        now: Optional[datetime] = None,
+        warning_period: timedelta = DEFAULT_WARNING_PERIOD,
+    ) -> Optional[KeyProblem]:
+        """Determine the most severe problem with a recipient's key.
+
+        Args:
+            recipient: Recipient specification from a ``.gpg-id``.
+            now: Reference time; defaults to the current time.
+            warning_period: How long before expiry to warn.
+
+        Returns:
+            The problem, or None if the key is fine.
+        """
+        key = self.find(recipient)
+        if key is None:
+            return KeyProblem.MISSING
+        if not key.usable:
+            return KeyProblem.UNUSABLE
+        now = now or datetime.now(timezone.utc)
+        expires = key.usable_until
+        if expires is not None and expires <= now:
+            return KeyProblem.UNUSABLE
+        if expires is not None and expires - now <= warning_period:
+            return KeyProblem.EXPIRING
+        if not key.trusted:
+            return KeyProblem.UNTRUSTED
+        return None
+
+    def check(
+        self,
+        recipients: RecipientService,
+        now: Optional[datetime] = None,
+        warning_period: timedelta = DEFAULT_WARNING_PERIOD,
+    ) -> list[KeyWarning]:
+        """Check every recipient of a store in one pass.
+
+        Args:
+            recipients: The store's recipient service.
+            now: Reference time; defaults to the current time.
+            warning_period: How long before expiry to warn.
+
+        Returns:
+            One warning per problematic recipient, listing the directories
+            that use it, ordered by recipient.
+        """
+        warnings: dict[str, KeyWarning] = {}
+        healthy = set()
+        for directory, specs in sorted(recipients.tree().items()):
+            for recipient in specs:
+                if recipient in healthy:
+                    continue
+                if recipient not in warnings:
+                    problem = self.diagnose(recipient, now, warning_period)
+                    if problem is None:
+                        healthy.add(recipient)
+                        continue
+                    warnings[recipient] = KeyWarning(
+                        recipient, problem, self.find(recipient)
+                    )
+                warnings[recipient].directories.append(directory)
+        return [warnings[recipient] for recipient in sorted(warnings)]
+
+    def __enter__(self) -> Self:
+        """Enter the context manager.
+
+        Returns:
+            Self: The service instance.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        """Exit the context manager.
+
+        Returns:
+            False to propagate exceptions.
+        """
+        return False
@@ -0,0 +1,335 @@
+"""Git repository maintenance service for GTKPass.
+
+Every change to a password store is an auto-commit, so after a few years the
+repository has accumulated many loose objects and small packs, and every
+``git log``/``diff``/``status`` gets slower (REQ-LIFE-018). This service
+watches the repository statistics and, once the application has been idle
+for a while, runs the tasks of ``git maintenance`` that are due: writing the
+commit-graph, packing loose objects, repacking small packs incrementally
+through a multi-pack-index and pruning. The
+tasks run at the lowest CPU and I/O priority and are interrupted when the
+service is closed, and the ``git log`` latency is measured before and after to
+report their effect.
+"""
+
+import logging
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Self
+
+from gtkpass.services.git import GitError, GitService
+
+logger = logging.getLogger(__name__)
+
+IDLE_DELAY = 300.0
+"""Seconds without activity before maintenance runs"""
+
+LOOSE_OBJECT_LIMIT = 100
+"""Loose objects from which they are packed (like ``git maintenance``)"""
+
+PACK_LIMIT = 10
+"""Packs from which the small ones are repacked incrementally"""
+
+MAX_BATCH_SIZE = 2 * 1024**3
+"""Upper bound of the incremental repack batch size, as in ``git maintenance``"""
+
+PRUNE_EXPIRY = "2.weeks.ago"
+"""Unreachable objects younger than this are kept, as ``git gc`` does"""
+
+LOG_SAMPLES = 3
+"""Timed ``git log`` runs; the fastest one is reported"""
+
+TASKS = ("loose-objects", "incremental-repack", "commit-graph")
+"""Maintenance tasks in the order they run"""
+
+TERMINATE_INTERVAL = 0.1
+"""Seconds between attempts to stop a run when the service is closed"""
+
+
+def idle_priority_wrapper() -> tuple[str, ...]:
+    """Return the command prefix running a process at the lowest priority.
+
+    Uses ``nice`` and, where available, the idle I/O class of ``ionice``.
+    """
+    wrapper: tuple[str, ...] = ()
+    if shutil.which("ionice"):
+        wrapper += ("ionice", "-c", "3")
+    if shutil.which("nice"):
+        wrapper += ("nice", "-n", "19")
+    return wrapper
+
+
+@dataclass
+class RepositoryStats:
+    """Object storage statistics of a repository."""
+
+    loose_objects: int
+    """Number of loose objects"""
+
+    packs: int
+    """Number of pack files"""
+
+    commit_graph: bool
+    """Whether a commit-graph file exists"""
+
+    def due_tasks(
+        self, loose_limit: int = LOOSE_OBJECT_LIMIT, pack_limit: int = PACK_LIMIT
+    ) -> list[str]:
+        """Return the maintenance tasks the statistics call for, in run order.
+
+        Args:
+            loose_limit: Loose objects from which they are packed.
+            pack_limit: Packs from which they are consolidated.
+        """
+        tasks = []
+        if self.loose_objects >= loose_limit:
+            tasks.append("loose-objects")
+        if self.packs >= pack_limit:
+            tasks.append("incremental-repack")
+        if not self.commit_graph or tasks:
+            tasks.append("commit-graph")
+        return tasks
+
+
+@dataclass
+class MaintenanceReport:
+    """Effect of a maintenance run."""
+
+    before: RepositoryStats
+    """Statistics before the run"""
+
+    after: RepositoryStats
+    """Statistics after the run"""
+
+    log_before: float
+    """Seconds a full ``git log`` took before the run"""
+
+    log_after: float
+    """Seconds a full ``git log`` took after the run"""
+
+    tasks: list[str] = field(default_factory=list)
+    """Tasks that were run"""
+
+
+class MaintenanceService:
+    """Service maintaining the git repository of a store when idle.
+
+    Example:
+        with MaintenanceService(store_path) as maintenance:
+            maintenance.schedule()
+    """
+
+    def __init__(
+        self,
+        repository: Path,
+        idle_delay: float = IDLE_DELAY,
+        loose_limit: int = LOOSE_OBJECT_LIMIT,
+        pack_limit: int = PACK_LIMIT,
+    ):
+        """
+        Initialize the maintenance service.
+
+        Args:
+            repository: Work tree of the repository (the store root).
+            idle_delay: Seconds without activity before maintenance runs.
+            loose_limit: Loose objects from which they are packed.
+            pack_limit: Packs from which they are consolidated.
+        """
+        self.git = GitService(repository, wrapper=idle_priority_wrapper())
+        self.last_report: Optional[MaintenanceReport] = None
+        self._idle_delay = idle_delay
+        self._loose_limit = loose_limit
+        self._pack_limit = pack_limit
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._active = False
+        self._stopping = threading.Event()
+
+    def stats(self) -> RepositoryStats:
+        """Collect the object storage statistics of the repository."""
+        counts = {}
+        for line in self.git.run("count-objects", "-v").splitlines():
+            key, _, value = line.partition(":")
+            counts[key.strip()] = value.strip()
+        info = Path(self.git.run("rev-parse", "--git-path", "objects/info").strip())
+        if not info.is_absolute():
+            info = self.git.repository / info
+        return RepositoryStats(
+            loose_objects=int(counts.get("count", 0)),
+            packs=int(counts.get("packs", 0)),
+            commit_graph=(info / "commit-graph").exists()
+            or (info / "commit-graphs" / "commit-graph-chain").exists(),
+        )
+
+    def _pack_directory(self) -> Path:
+        """Return the directory holding the repository's pack files."""
+        packs = Path(self.git.run("rev-parse", "--git-path", "objects/pack").strip())
+        return packs if packs.is_absolute() else self.git.repository / packs
+
+    def batch_size(self) -> int:
+        """Return the incremental repack batch size.
+
+        Like ``git maintenance``, this is one more than the size of the second
+        largest pack, so the largest pack is left alone and all smaller packs
+        are combined, capped at :data:`MAX_BATCH_SIZE`.
+        """
+        sizes = sorted(
+            (pack.stat().st_size for pack in self._pack_directory().glob("*.pack")),
+            reverse=True,
+        )
+        if len(sizes) < 2:
+            return 0
+        return min(sizes[1] + 1, MAX_BATCH_SIZE)
+
+    def commands(self, task: str) -> list[tuple[str, ...]]:
+        """Return the git commands of a maintenance task, in order.
+
+        ``incremental-repack`` follows ``git maintenance``: the packs are
+        indexed by a multi-pack-index, packs whose objects all moved to newer
+        packs are expired and the small packs are rewritten into one. Packs
+        replaced by that repack are expired on the next run, so concurrent
+        readers never lose a pack they have open.
+
+        Args:
+            task: One of :data:`TASKS`.
+        """
+        if task == "loose-objects":
+            return [("repack", "-d", "--quiet"), ("prune", f"--expire={PRUNE_EXPIRY}")]
+        if task == "incremental-repack":
+            return [
+                ("multi-pack-index", "write", "--no-progress"),
+                ("multi-pack-index", "expire", "--no-progress"),
+                (
+                    "multi-pack-index",
+                    "repack",
+                    "--no-progress",
+                    f"--batch-size={self.batch_size()}",
+                ),
+            ]
+        if task == "commit-graph":
+            return [("commit-graph", "write", "--reachable", "--changed-paths")]
+        raise ValueError(f"Unknown maintenance task {task}")
+
+    def log_latency(self) -> float:
+        """Measure how long a full ``git log`` takes, in seconds."""
+        timings = []
+        for _ in range(LOG_SAMPLES):
+            start = time.perf_counter()
+            self.git.run("log", "--format=%H", check=False)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    def run(self, force: bool = False) -> Optional[MaintenanceReport]:
+        """Run the maintenance tasks that are due.
+
+        Args:
+            force: Run all tasks regardless of the statistics.
+
+        Returns:
+            The report, or None if nothing was due or the run was
+            interrupted because the service was closed.
+        """
+        with self._run_lock:
+            try:
+                report = self._run_tasks(force)
+            except GitError:
+                if not self._stopping.is_set():
+                    raise
+                report = None
+            if report is None:
+                if self._stopping.is_set():
+                    logger.info(f"Maintenance of {self.git.repository} interrupted")
+                return None
+        logger.info(
+            f"Maintained {self.git.repository} ({', '.join(report.tasks)}): "
+            f"{report.before.loose_objects} -> {report.after.loose_objects} loose "
+            f"objects, {report.before.packs} -> {report.after.packs} packs, "
+            f"git log {report.log_before * 1000:.1f} -> "
+            f"{report.log_after * 1000:.1f} ms"
+        )
+        self.last_report = report
+        return report
+
+    def _run_tasks(self, force: bool) -> Optional[MaintenanceReport]:
+        """Run the due tasks, stopping early when the service is closed."""
+        if self.git.head() is None:
+            return None
+        before = self.stats()
+        tasks = (
+            list(TASKS)
+            if force
+            else before.due_tasks(self._loose_limit, self._pack_limit)
+        )
+        if not tasks:
+            return None
+        log_before = self.log_latency()
+        for task in tasks:
+            logger.debug(f"Running maintenance task {task}")
+            for command in self.commands(task):
+                if self._stopping.is_set():
+                    return None
+                self.git.run(*command)
+        report = MaintenanceReport(
+            before, self.stats(), log_before, self.log_latency(), tasks
+        )
+        return None if self._stopping.is_set() else report
+
+    def schedule(self) -> None:
+        """Note activity; maintenance runs once the idle delay has passed.
+
+        Every call restarts the idle period. Stores without git are ignored.
+        """
+        if not self.git.is_repository():
+            return
+        with self._lock:
+            if not self._active:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self._idle_delay, self._run_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run_in_background(self) -> None:
+        """Run from the timer thread, logging instead of raising."""
+        with self._lock:
+            self._timer = None
+        try:
+            self.run()
+        except Exception:
+            logger.exception("Repository maintenance failed")
+
+    def __enter__(self) -> Self:
+        """Enter the context manager and allow scheduled runs.
+
+        Returns:
+            Self: The service instance.
+        """
+        with self._lock:
+            self._active = True
+        self._stopping.clear()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        """Exit the context manager, cancelling a scheduled run.
+
+        A run that has already started is interrupted: its git commands are
+        terminated, which git maintenance tasks are safe against.
+
+        Returns:
+            False to propagate exceptions.
+        """
+        with self._lock:
+            self._active = False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self._stopping.set()
+        while not self._run_lock.acquire(timeout=TERMINATE_INTERVAL):
+            self.git.terminate()
+        self._run_lock.release()
+        return False
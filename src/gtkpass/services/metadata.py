@@ -0,0 +1,282 @@
+"""Metadata cache for GTKPass.
+
+Usernames and URLs live inside the encrypted password files, so showing them
+in the entry list would need one decryption per entry. This module keeps
+them in a single sidecar file, encrypted to the user's own keys, that the
+application decrypts once per session; headless callers that never load it
+never run gpg for it. Records are keyed by the git blob hash of the
+encrypted file: an entry is only decrypted again after its file changed, and
+a renamed entry keeps its record.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Self
+
+from gtkpass.models.password import Password
+from gtkpass.services.gpg import GPGError, GPGService
+from gtkpass.services.persistence import WriteBehindService
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+"""Format version of the decrypted cache contents"""
+
+
+def cache_path(store_path: Path) -> Path:
+    """Return the location of the metadata cache of a store."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    digest = hashlib.sha256(str(store_path.resolve()).encode()).hexdigest()[:16]
+    return Path(cache_home) / "gtkpass" / f"{digest}.metadata.gpg"
+
+
+def blob_id(data: bytes) -> str:
+    """Return the git blob hash of file contents."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+@dataclass(frozen=True)
+class EntryMetadata:
+    """Non-secret fields of a password file."""
+
+    username: Optional[str] = None
+    """Username or login of the entry"""
+
+    url: Optional[str] = None
+    """URL the entry is for"""
+
+    @property
+    def subtitle(self) -> Optional[str]:
+        """Text shown below the entry name in lists, if any."""
+        return " · ".join(filter(None, (self.username, self.url))) or None
+
+
+class MetadataCache:
+    """Encrypted cache of the usernames and URLs of a store's entries.
+
+    Example:
+        with MetadataCache(store_path) as metadata:
+            metadata.load()
+            subtitle = metadata.subtitle("work/github")
+    """
+
+    def __init__(
+        self,
+        store_path: Path,
+        gpg: Optional[GPGService] = None,
+        path: Optional[Path] = None,
+        writer: Optional[WriteBehindService] = None,
+    ):
+        """
+        Initialize the metadata cache.
+
+        Args:
+            store_path: Root of the password store.
+            gpg: GPG service used to decrypt and encrypt the cache.
+            path: Cache file; defaults to :func:`cache_path`.
+            writer: Write-behind queue of the store; files of entries added
+                while their write is still queued are not hashed.
+        """
+        self.store_path = store_path
+        self.path = path or cache_path(store_path)
+        self._gpg = gpg or GPGService()
+        self._writer = writer
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+        self._records: dict[str, EntryMetadata] = {}
+        self._files: dict[str, tuple[str, Optional[tuple[int, int]]]] = {}
+
+    def _file(self, path: str) -> Path:
+        """Return the encrypted file of a store path."""
+        return self.store_path / f"{path}.gpg"
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the cache file has been read this session."""
+        return self._loaded
+
+    def load(self) -> None:
+        """Decrypt the cache file, once per session.
+
+        A missing or unreadable cache starts out empty.
+        """
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                data = json.loads(self._gpg.decrypt(self.path.read_bytes()))
+                if data["version"] != CACHE_VERSION:
+                    raise ValueError(f"unknown version {data['version']}")
+                self._records = {
+                    blob: EntryMetadata(**fields)
+                    for blob, fields in data["records"].items()
+                }
+                self._files = {
+                    path: (blob, tuple(signature) if signature else None)
+                    for path, (blob, signature) in data["files"].items()
+                }
+            except FileNotFoundError:
+                return
+            except (GPGError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable metadata cache {self.path}: {e}")
+                return
+            logger.debug(f"Loaded metadata of {len(self._files)} entries")
+
+    def _queued(self, path: str) -> bool:
+        """Whether the file of an entry is still queued for writing."""
+        return self._writer is not None and f"{path}.gpg" in self._writer.pending()
+
+    def _blob(self, path: str) -> Optional[str]:
+        """Return the blob hash of an entry's file, rehashing it if it changed.
+
+        Entries recorded by :meth:`add` keep their blob while the file is
+        queued for writing; its signature is recorded once it is written.
+        """
+        known = self._files.get(path)
+        if known is not None and known[1] is None and self._queued(path):
+            return known[0]
+        try:
+            stat = self._file(path).stat()
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if known is not None and known[1] == signature:
+            return known[0]
+        try:
+            blob = blob_id(self._file(path).read_bytes())
+        except OSError:
+            return None
+        self._files[path] = (blob, signature)
+        return blob
+
+    def lookup(self, path: str) -> Optional[EntryMetadata]:
+        """Return the cached metadata of an entry's current file.
+
+        Lookups never decrypt the cache; until :meth:`load` has been called
+        nothing is found.
+
+        Args:
+            path: Store path of the entry, e.g. ``work/github``.
+
+        Returns:
+            The metadata, or None if the file is not in the cache (yet).
+        """
+        with self._lock:
+            if not self._records:
+                return None
+            return self._records.get(self._blob(path))
+
+    def subtitle(self, path: str) -> Optional[str]:
+        """Return the list subtitle of an entry, if its metadata is cached.
+
+        Args:
+            path: Store path of the entry, e.g. ``work/github``.
+        """
+        metadata = self.lookup(path)
+        return metadata.subtitle if metadata is not None else None
+
+    def add(self, path: str, data: bytes, password: Password) -> EntryMetadata:
+        """Record the metadata of an entry.
+
+        Args:
+            path: Store path of the entry, e.g. ``work/github``.
+            data: The encrypted file contents the password was read from or
+                is being written as.
+            password: The decrypted entry.
+
+        Returns:
+            The recorded metadata.
+        """
+        self.load()
+        metadata = EntryMetadata(password.username, password.url)
+        with self._lock:
+            blob = blob_id(data)
+            self._records[blob] = metadata
+            self._files[path] = (blob, None)
+            self._dirty = True
+        return metadata
+
+    def remove(self, path: str) -> None:
+        """Forget an entry, e.g. after it was deleted.
+
+        Args:
+            path: Store path of the entry.
+        """
+        self.load()
+        with self._lock:
+            if self._files.pop(path, None) is not None:
+                self._dirty = True
+
+    def save(self) -> None:
+        """Encrypt and write the cache if it has unsaved changes.
+
+        The cache is encrypted to the user's usable secret keys, so it stays
+        readable regardless of the store's recipients. Records of files no
+        longer in the store are dropped. Without such a key the cache is not
+        written, never stored in plain text.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            referenced = {blob for blob, _ in self._files.values()}
+            self._records = {
+                blob: metadata
+                for blob, metadata in self._records.items()
+                if blob in referenced
+            }
+            data = json.dumps(
+                {
+                    "version": CACHE_VERSION,
+                    "records": {
+                        blob: {"username": m.username, "url": m.url}
+                        for blob, m in self._records.items()
+                    },
+                    "files": self._files,
+                }
+            ).encode()
+            self._dirty = False
+        fingerprints = [
+            key.fingerprint
+            for key in self._gpg.list_secret_keys()
+            if key.usable and key.can_encrypt
+        ]
+        if not fingerprints:
+            logger.warning("Not saving the metadata cache: no usable secret key")
+            return
+        try:
+            encrypted = self._gpg.encrypt(data, fingerprints)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as stream:
+                stream.write(encrypted)
+            os.replace(temporary, self.path)
+        except (OSError, GPGError):
+            with self._lock:
+                self._dirty = True
+            raise
+        logger.debug(f"Saved metadata of {len(self._files)} entries")
+
+    def __enter__(self) -> Self:
+        """Enter the context manager.
+
+        Returns:
+            Self: The service instance.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        """Exit the context manager, saving pending changes.
+
+        Returns:
+            False to propagate exceptions.
+        """
+        self.save()
+        return False
@@ -0,0 +1,243 @@
+"""Write-behind persistence service for GTKPass.
+
+Changes to password files are queued and written in batches: every file is
+replaced atomically (temporary file + rename), the fsyncs of a batch are
+grouped, and all changes made within a short window are folded into a
+single git commit. Leaving the context manager flushes everything that is
+still queued, so no change is lost on application quit.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Self
+
+from gtkpass.services.git import GitService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DELAY = 0.5
+"""Seconds to wait for further changes before a batch is written"""
+
+
+def combined_message(messages: list[str]) -> str:
+    """Fold the messages of a batch into one commit message.
+
+    Args:
+        messages: Messages of the individual changes, in order.
+
+    Returns:
+        The message itself for a single change, otherwise a summary line
+        followed by one line per change.
+    """
+    unique = list(dict.fromkeys(messages))
+    if len(unique) == 1:
+        return unique[0]
+    return f"Update {len(unique)} entries\n\n" + "\n".join(
+        f"- {message}" for message in unique
+    )
+
+
+def _fsync(path: Path) -> None:
+    """Flush a file or directory to stable storage."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class WriteBehindService:
+    """Service queueing file changes and persisting them in batches.
+
+    Example:
+        with WriteBehindService(store_path, GitService(store_path)) as writer:
+            writer.write("work/github.gpg", data, "Edit work/github")
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        git: Optional[GitService] = None,
+        delay: float = DEFAULT_DELAY,
+    ):
+        """
+        Initialize the write-behind service.
+
+        Args:
+            root: Directory the queued paths are relative to.
+            git: Git service committing each batch, if the store uses git.
+            delay: Seconds to wait for further changes before writing.
+        """
+        self.root = root
+        self._git = git
+        self._delay = delay
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: dict[str, Optional[bytes]] = {}
+        self._inflight: dict[str, Optional[bytes]] = {}
+        self._messages: list[str] = []
+        self._uncommitted: tuple[list[str], set[str]] = ([], set())
+        self._timer: Optional[threading.Timer] = None
+        self._active = False
+
+    def write(self, path: str, data: bytes, message: str) -> None:
+        """Queue the new contents of a file.
+
+        Args:
+            path: File path relative to the root, e.g. ``work/github.gpg``.
+            data: The complete new file contents.
+            message: Description of the change for the commit message.
+        """
+        self._enqueue(path, data, message)
+
+    def delete(self, path: str, message: str) -> None:
+        """Queue the removal of a file.
+
+        Args:
+            path: File path relative to the root.
+            message: Description of the change for the commit message.
+        """
+        self._enqueue(path, None, message)
+
+    def pending(self) -> dict[str, Optional[bytes]]:
+        """Return the changes not yet persisted (None marks a deletion).
+
+        Changes of the batch being flushed are included until its commit
+        has been attempted.
+        """
+        with self._lock:
+            return {**self._inflight, **self._pending}
+
+    def _enqueue(self, path: str, data: Optional[bytes], message: str) -> None:
+        """Queue a change and make sure a flush is scheduled."""
+        with self._lock:
+            if not self._active:
+                raise RuntimeError(
+                    "WriteBehindService not initialized. Use it as a context "
+                    "manager:\n"
+                    "    with WriteBehindService(root) as writer:\n"
+                    "        writer.write(...)"
+                )
+            self._pending[path] = data
+            self._messages.append(message)
+            if self._timer is None:
+                self._timer = threading.Timer(self._delay, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_in_background(self) -> None:
+        """Flush from the timer thread, logging instead of raising."""
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Writing queued changes failed")
+
+    def flush(self) -> None:
+        """Persist all queued changes now.
+
+        Files are written to temporary siblings first, synced as a group,
+        renamed into place and their directories synced once each. The batch
+        is then committed with a combined message. If writing fails, the
+        batch is queued again unless it was superseded meanwhile; if only
+        the commit fails, it is retried with the next batch.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                pending, self._pending = self._pending, {}
+                messages, self._messages = self._messages, []
+                self._inflight = pending
+            try:
+                if pending:
+                    self._persist(pending)
+                    logger.debug(f"Persisted {len(pending)} changes")
+            except BaseException:
+                with self._lock:
+                    self._pending = {**pending, **self._pending}
+                    self._messages = messages + self._messages
+                    self._inflight = {}
+                raise
+            try:
+                self._commit(messages, set(pending))
+            finally:
+                with self._lock:
+                    self._inflight = {}
+
+    def _commit(self, messages: list[str], paths: set[str]) -> None:
+        """Commit a persisted batch together with earlier failed commits."""
+        earlier_messages, earlier_paths = self._uncommitted
+        messages, paths = earlier_messages + messages, earlier_paths | paths
+        if not messages or self._git is None or not self._git.is_repository():
+            self._uncommitted = ([], set())
+            return
+        try:
+            self._git.commit(combined_message(messages), sorted(paths))
+        except BaseException:
+            self._uncommitted = (messages, paths)
+            raise
+        self._uncommitted = ([], set())
+
+    def _persist(self, pending: dict[str, Optional[bytes]]) -> None:
+        """Atomically apply a batch of changes to the filesystem."""
+        temporaries = []
+        try:
+            for path, data in pending.items():
+                if data is not None:
+                    temporaries.append((self._write_temporary(path, data), path))
+            for temporary, _ in temporaries:
+                _fsync(temporary)
+        except BaseException:
+            for temporary, _ in temporaries:
+                temporary.unlink(missing_ok=True)
+            raise
+
+        directories = set()
+        for temporary, path in temporaries:
+            os.replace(temporary, self.root / path)
+            directories.add((self.root / path).parent)
+        for path, data in pending.items():
+            if data is None:
+                try:
+                    (self.root / path).unlink()
+                except FileNotFoundError:
+                    continue
+                directories.add((self.root / path).parent)
+        for directory in directories:
+            _fsync(directory)
+
+    def _write_temporary(self, path: str, data: bytes) -> Path:
+        """Write data to a new temporary file next to its destination."""
+        target = self.root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(
+            dir=target.parent, prefix=f".{target.name}.", suffix=".tmp"
+        )
+        with os.fdopen(fd, "wb") as stream:
+            stream.write(data)
+        return Path(temporary)
+
+    def __enter__(self) -> Self:
+        """Enter the context manager and start accepting changes.
+
+        Returns:
+            Self: The initialized service instance.
+        """
+        with self._lock:
+            self._active = True
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        """Exit the context manager, persisting all queued changes.
+
+        Returns:
+            False to propagate exceptions.
+        """
+        with self._lock:
+            self._active = False
+        self.flush()
+        return False
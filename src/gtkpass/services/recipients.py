@@ -0,0 +1,229 @@
+"""Recipient resolution service for GTKPass.
+
+Every password file is encrypted to the recipients listed in the nearest
+``.gpg-id`` file above it. This module reads all ``.gpg-id`` files of a store
+once into an in-memory tree, resolves every recipient to a key fingerprint
+with a single ``gpg --with-colons`` call and answers per-file lookups from
+memory. When a ``.gpg-id`` changes, only the affected subtree is reloaded.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Self
+
+from gtkpass.services.gpg import GPGError, GPGService, keyring_signature
+
+logger = logging.getLogger(__name__)
+
+GPG_ID = ".gpg-id"
+"""Name of the files listing the recipients of a directory"""
+
+
+def _parent(path: str) -> str:
+    """Return the parent store directory of a store path ("" is the root)."""
+    return path.rpartition("/")[0]
+
+
+def _within(directory: str, subtree: str) -> bool:
+    """Check whether a store directory lies in (or is) a subtree."""
+    return not subtree or directory == subtree or directory.startswith(subtree + "/")
+
+
+class RecipientService:
+    """Service resolving the recipients that apply to password files.
+
+    Example:
+        with RecipientService(store_path) as recipients:
+            fingerprints = recipients.fingerprints_for("work/github")
+    """
+
+    def __init__(self, store_path: Path, gpg: Optional[GPGService] = None):
+        """
+        Initialize the recipient service.
+
+        Args:
+            store_path: Root of the password store.
+            gpg: GPG service used to resolve recipients to keys.
+        """
+        self.store_path = store_path
+        self._gpg = gpg or GPGService()
+        self._lock = threading.RLock()
+        self._tree: Optional[dict[str, tuple[str, ...]]] = None
+        self._owners: dict[str, Optional[str]] = {}
+        self._fingerprints: dict[str, Optional[str]] = {}
+        self._keyring: Optional[tuple] = None
+
+    def _read_gpg_id(self, directory: str) -> tuple[str, ...]:
+        """Read the recipients listed in the ``.gpg-id`` of a store directory."""
+        text = (self.store_path / directory / GPG_ID).read_text()
+        recipients = (line.partition("#")[0].strip() for line in text.splitlines())
+        return tuple(recipient for recipient in recipients if recipient)
+
+    def _walk(self, directory: str) -> dict[str, tuple[str, ...]]:
+        """Collect the ``.gpg-id`` files of a subtree."""
+        found = {}
+        try:
+            with os.scandir(self.store_path / directory) as it:
+                children = list(it)
+        except (FileNotFoundError, NotADirectoryError):
+            return found
+        prefix = f"{directory}/" if directory else ""
+        for child in children:
+            if child.name == GPG_ID and child.is_file():
+                found[directory] = self._read_gpg_id(directory)
+            elif not child.name.startswith(".") and child.is_dir():
+                found.update(self._walk(prefix + child.name))
+        return found
+
+    def _ensure_tree(self) -> dict[str, tuple[str, ...]]:
+        """Build the ``.gpg-id`` tree on first use."""
+        with self._lock:
+            if self._tree is None:
+                self._tree = self._walk("")
+                logger.debug(f"Loaded {len(self._tree)} {GPG_ID} files")
+            return self._tree
+
+    def tree(self) -> dict[str, tuple[str, ...]]:
+        """Return the recipients of every directory that has a ``.gpg-id``.
+
+        Returns:
+            Mapping of store directory ("" for the root) to its recipients.
+        """
+        return dict(self._ensure_tree())
+
+    def gpg_id_directory(self, path: str) -> Optional[str]:
+        """Find the directory whose ``.gpg-id`` applies to a password file.
+
+        Args:
+            path: Store path of the entry, e.g. ``work/github``.
+
+        Returns:
+            The store directory holding the nearest ``.gpg-id`` or None if
+            the store has none.
+        """
+        directory = _parent(path)
+        with self._lock:
+            if directory in self._owners:
+                return self._owners[directory]
+            tree = self._ensure_tree()
+            candidate: Optional[str] = directory
+            visited = []
+            while candidate is not None and candidate not in tree:
+                visited.append(candidate)
+                if candidate in self._owners:
+                    candidate = self._owners[candidate]
+                    break
+                candidate = _parent(candidate) if candidate else None
+            for seen in visited:
+                self._owners[seen] = candidate
+            self._owners[directory] = candidate
+            return candidate
+
+    def recipients_for(self, path: str) -> tuple[str, ...]:
+        """Return the recipients a password file is encrypted to.
+
+        Args:
+            path: Store path of the entry, e.g. ``work/github``.
+
+        Returns:
+            The recipient specifications from the nearest ``.gpg-id``.
+        """
+        directory = self.gpg_id_directory(path)
+        if directory is None:
+            return ()
+        return self._ensure_tree()[directory]
+
+    def resolve(self) -> dict[str, Optional[str]]:
+        """Resolve every recipient of the store to a key fingerprint.
+
+        All recipients that are not resolved yet are looked up with a single
+        gpg invocation. Resolved fingerprints are kept until the keyring
+        files change, e.g. after a key was imported.
+
+        Returns:
+            Mapping of recipient specification to fingerprint, or None for
+            recipients without a key in the keyring.
+        """
+        signature = keyring_signature(self._gpg.homedir)
+        with self._lock:
+            if signature != self._keyring:
+                self.invalidate_keys()
+                self._keyring = signature
+            pending = {
+                recipient
+                for recipients in self._ensure_tree().values()
+                for recipient in recipients
+                if recipient not in self._fingerprints
+            }
+            if pending:
+                keys = self._gpg.list_keys(*sorted(pending))
+                for recipient in pending:
+                    self._fingerprints[recipient] = next(
+                        (key.fingerprint for key in keys if key.matches(recipient)),
+                        None,
+                    )
+            return dict(self._fingerprints)
+
+    def fingerprints_for(self, path: str) -> list[str]:
+        """Return the key fingerprints a password file is encrypted to.
+
+        Args:
+            path: Store path of the entry, e.g. ``work/github``.
+
+        Returns:
+            Fingerprints of the recipients, in ``.gpg-id`` order.
+
+        Raises:
+            GPGError: If a recipient has no key in the keyring. Like ``pass``,
+                files are never encrypted to a subset of their recipients.
+        """
+        fingerprints = self.resolve()
+        recipients = self.recipients_for(path)
+        missing = [r for r in recipients if fingerprints[r] is None]
+        if missing:
+            raise GPGError(f"No public key for {', '.join(missing)} ({path})")
+        return [fingerprints[r] for r in recipients]
+
+    def invalidate(self, directory: str = "") -> None:
+        """Reload the ``.gpg-id`` files of a subtree after a change.
+
+        Args:
+            directory: Store directory whose ``.gpg-id`` (or a nested one)
+                changed; the whole store when omitted.
+        """
+        with self._lock:
+            if self._tree is None:
+                return
+            self._tree = {
+                d: r for d, r in self._tree.items() if not _within(d, directory)
+            }
+            self._tree.update(self._walk(directory))
+            self._owners = {
+                d: owner
+                for d, owner in self._owners.items()
+                if not _within(d, directory)
+            }
+            logger.debug(f"Reloaded {GPG_ID} files below '{directory}'")
+
+    def invalidate_keys(self) -> None:
+        """Forget resolved fingerprints, e.g. after the keyring changed."""
+        with self._lock:
+            self._fingerprints.clear()
+
+    def __enter__(self) -> Self:
+        """Enter the context manager.
+
+        Returns:
+            Self: The service instance.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        """Exit the context manager.
+
+        Returns:
+            False to propagate exceptions.
+        """
+        return False
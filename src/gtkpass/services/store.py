@@ -0,0 +1,367 @@
+"""Password store service for GTKPass.
+
+This module reads a passwordstore directory (``~/.password-store``) without
+importing GTK, so it can back both the application and the command line
+interface.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Self
+
+from gtkpass.models.password import Password, PasswordEntry
+from gtkpass.services.git import GitService
+from gtkpass.services.gpg import GPGError, GPGService
+from gtkpass.services.index import EntryIndex
+from gtkpass.services.maintenance import MaintenanceService
+from gtkpass.services.metadata import MetadataCache
+from gtkpass.services.persistence import WriteBehindService
+from gtkpass.services.recipients import GPG_ID, RecipientService
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_SUFFIX = ".gpg"
+"""Suffix of encrypted password files"""
+
+
+def default_store_path() -> Path:
+    """Return the location of the password store.
+
+    Honours ``PASSWORD_STORE_DIR`` like ``pass`` does and falls back to
+    ``~/.password-store``.
+    """
+    configured = os.environ.get("PASSWORD_STORE_DIR")
+    if configured:
+        return Path(configured).expanduser()
+    return Path.home() / ".password-store"
+
+
+def _scan(root: Path, prefix: str = "") -> Iterator[str]:
+    """Yield the store paths of all password files below root.
+
+    Hidden files and directories (``.git``, ``.gpg-id``, ...) are skipped.
+    """
+    try:
+        with os.scandir(root) as it:
+            children = sorted(it, key=lambda e: e.name)
+    except FileNotFoundError:
+        return
+    for child in children:
+        if child.name.startswith("."):
+            continue
+        if child.is_dir():
+            yield from _scan(Path(child.path), f"{prefix}{child.name}/")
+        elif child.name.endswith(PASSWORD_SUFFIX):
+            yield prefix + child.name[: -len(PASSWORD_SUFFIX)]
+
+
+def entry_for(
+    store_path: str, store: Optional[str] = None, subtitle: Optional[str] = None
+) -> PasswordEntry:
+    """Create the list entry for a store path such as ``work/github``."""
+    return PasswordEntry(
+        name=store_path.rpartition("/")[2],
+        path=Path(store_path),
+        subtitle=subtitle,
+        store=store,
+    )
+
+
+class PasswordStoreService:
+    """Service for reading entries from a passwordstore directory.
+
+    Example:
+        with PasswordStoreService() as store:
+            for entry in store.list_passwords():
+                print(entry.path)
+    """
+
+    def __init__(
+        self,
+        store_path: Optional[Path] = None,
+        gpg: Optional[GPGService] = None,
+        name: Optional[str] = None,
+    ):
+        """
+        Initialize the password store service.
+
+        Args:
+            store_path: Root of the password store; defaults to
+                :func:`default_store_path`.
+            gpg: GPG service used for decryption.
+            name: Name qualifying the entry paths when several stores are
+                used side by side.
+        """
+        self.store_path = store_path or default_store_path()
+        self.name = name
+        self.index = EntryIndex()
+        self._gpg = gpg or GPGService()
+        self.recipients = RecipientService(self.store_path, self._gpg)
+        self.git = GitService(self.store_path)
+        self.writer = WriteBehindService(self.store_path, self.git)
+        self.metadata = MetadataCache(self.store_path, self._gpg, writer=self.writer)
+        self.maintenance = MaintenanceService(self.store_path)
+        self._warm: dict[str, tuple[tuple[int, int], bytes]] = {}
+
+    def file_path(self, path: str) -> Path:
+        """Return the filesystem path of the encrypted file for an entry.
+
+        Args:
+            path: Store path of the entry, e.g. ``work/github``.
+        """
+        return self.store_path / f"{path}{PASSWORD_SUFFIX}"
+
+    def scan(self) -> EntryIndex:
+        """Rescan the store directory and refresh the index.
+
+        Changes still queued in :attr:`writer` take precedence over the
+        files on disk. Subtitles are filled from the metadata cache if it has
+        been loaded; entries missing from it are left for :meth:`fill_metadata`.
+
+        Returns:
+            The refreshed index.
+        """
+        paths = set(_scan(self.store_path))
+        for file, data in self.writer.pending().items():
+            if file.endswith(PASSWORD_SUFFIX):
+                path = file[: -len(PASSWORD_SUFFIX)]
+                if data is None:
+                    paths.discard(path)
+                else:
+                    paths.add(path)
+        self.index.replace(
+            entry_for(path, self.name, self.metadata.subtitle(path)) for path in paths
+        )
+        logger.debug(f"Indexed {len(self.index)} entries in {self.store_path}")
+        return self.index
+
+    def list_passwords(self) -> list[PasswordEntry]:
+        """List all entries of the store, scanning it on first use.
+
+        Returns:
+            The entries sorted by path.
+        """
+        if not len(self.index):
+            self.scan()
+        return self.index.entries()
+
+    def search(self, query: str) -> list[PasswordEntry]:
+        """Find entries whose path contains all words of the query.
+
+        Args:
+            query: Whitespace separated search terms.
+
+        Returns:
+            The matching entries sorted by path.
+        """
+        if not len(self.index):
+            self.scan()
+        return [self.index.get(path) for path in self.index.search(query.split())]
+
+    def get_password(self, path: str) -> Password:
+        """Decrypt and parse an entry.
+
+        Args:
+            path: Store path of the entry, e.g. ``work/github``.
+
+        Returns:
+            The decrypted password.
+
+        Raises:
+            FileNotFoundError: If the entry does not exist.
+            GPGError: If decryption fails.
+        """
+        queued = self.writer.pending().get(f"{path}{PASSWORD_SUFFIX}", b"")
+        if queued is None:
+            raise FileNotFoundError(self.file_path(path))
+        data = queued or self._warmed(path)
+        if data:
+            content = self._gpg.decrypt(data)
+        else:
+            content = self._gpg.decrypt_file(self.file_path(path))
+        return Password.from_passwordstore_format(
+            content, name=path.rpartition("/")[2], path=Path(path)
+        )
+
+    def apply_changes(
+        self, changed: Iterable[str], removed: Iterable[str]
+    ) -> tuple[list[str], list[str]]:
+        """Update the index and caches for files changed behind our back.
+
+        Used after a git pull instead of a full :meth:`scan`: only the given
+        files are looked at again.
+
+        Args:
+            changed: Added or modified files, relative to the store root.
+            removed: Deleted files, relative to the store root.
+
+        Returns:
+            The store paths of the changed and of the removed entries.
+        """
+        changed_paths: list[str] = []
+        removed_paths: list[str] = []
+        for files, paths in ((changed, changed_paths), (removed, removed_paths)):
+            for file in files:
+                directory, _, name = file.rpartition("/")
+                if name == GPG_ID:
+                    self.recipients.invalidate(directory)
+                elif name.endswith(PASSWORD_SUFFIX) and not any(
+                    part.startswith(".") for part in file.split("/")
+                ):
+                    paths.append(file[: -len(PASSWORD_SUFFIX)])
+        for path in changed_paths + removed_paths:
+            self._warm.pop(path, None)
+        for path in removed_paths:
+            self.metadata.remove(path)
+        self.index.update(
+            added=[
+                entry_for(path, self.name, self.metadata.subtitle(path))
+                for path in changed_paths
+            ],
+            removed=[
+                entry_for(path, self.name).qualified_path for path in removed_paths
+            ],
+        )
+        return changed_paths, removed_paths
+
+    def fill_metadata(self) -> list[PasswordEntry]:
+        """Load the metadata cache and decrypt the entries missing from it.
+
+        Only entries that are new or changed since the cache was last
+        updated are decrypted. Subtitles are updated in the index and the
+        cache is saved.
+
+        Returns:
+            The entries whose subtitle changed.
+        """
+        self.metadata.load()
+        pending = self.writer.pending()
+        updated = []
+        decrypted = 0
+        for entry in self.index.entries():
+            path = entry.path.as_posix()
+            if f"{path}{PASSWORD_SUFFIX}" in pending:
+                continue
+            metadata = self.metadata.lookup(path)
+            if metadata is None:
+                try:
+                    data = self.file_path(path).read_bytes()
+                    password = Password.from_passwordstore_format(
+                        self._gpg.decrypt(data), name=entry.name, path=entry.path
+                    )
+                except (OSError, GPGError) as e:
+                    logger.warning(f"Reading metadata of {path} failed: {e}")
+                    continue
+                metadata = self.metadata.add(path, data, password)
+                password.clear()
+                decrypted += 1
+            if metadata.subtitle != entry.subtitle:
+                updated.append(entry_for(path, self.name, metadata.subtitle))
+        self.index.update(added=updated)
+        self.metadata.save()
+        logger.debug(f"Decrypted metadata of {decrypted} entries")
+        return updated
+
+    def warm(self, paths: Iterable[str]) -> None:
+        """Read the encrypted files of entries ahead of use.
+
+        Opening a warmed entry only needs a stat and the decryption, which
+        matters for stores on slow (e.g. network) filesystems.
+
+        Args:
+            paths: Store paths of the entries to warm.
+        """
+        for path in paths:
+            try:
+                with open(self.file_path(path), "rb") as stream:
+                    stat = os.fstat(stream.fileno())
+                    data = stream.read()
+            except OSError:
+                self._warm.pop(path, None)
+                continue
+            self._warm[path] = ((stat.st_mtime_ns, stat.st_size), data)
+
+    def _warmed(self, path: str) -> Optional[bytes]:
+        """Return the warmed ciphertext of an entry if its file is unchanged.
+
+        Copies that are outdated, e.g. after ``pass edit``, are dropped.
+        """
+        warmed = self._warm.get(path)
+        if warmed is None:
+            return None
+        try:
+            stat = self.file_path(path).stat()
+        except OSError:
+            stat = None
+        if stat is None or (stat.st_mtime_ns, stat.st_size) != warmed[0]:
+            self._warm.pop(path, None)
+            return None
+        return warmed[1]
+
+    def save_password(self, password: Password, message: Optional[str] = None):
+        """Encrypt an entry and queue it for writing.
+
+        The entry is encrypted to the recipients of its nearest ``.gpg-id``
+        and persisted (and committed) in the background by :attr:`writer`.
+
+        Args:
+            password: The entry; its path is the store path.
+            message: Commit message for the change.
+
+        Raises:
+            GPGError: If there are no recipients, one of them has no key or
+                encryption fails.
+        """
+        path = password.path.as_posix()
+        fingerprints = self.recipients.fingerprints_for(path)
+        if not fingerprints:
+            raise GPGError(f"No {GPG_ID} applies to {path}")
+        data = self._gpg.encrypt(
+            password.to_passwordstore_format().encode(), fingerprints
+        )
+        self._warm.pop(path, None)
+        self.writer.write(
+            f"{path}{PASSWORD_SUFFIX}",
+            data,
+            message or f"Edit password for {path} using GTKPass.",
+        )
+        metadata = self.metadata.add(path, data, password)
+        self.index.update(added=[entry_for(path, self.name, metadata.subtitle)])
+        self.maintenance.schedule()
+
+    def delete_password(self, path: str, message: Optional[str] = None):
+        """Queue the removal of an entry.
+
+        Args:
+            path: Store path of the entry, e.g. ``work/github``.
+            message: Commit message for the change.
+        """
+        self._warm.pop(path, None)
+        self.metadata.remove(path)
+        self.writer.delete(
+            f"{path}{PASSWORD_SUFFIX}", message or f"Remove {path} from store."
+        )
+        self.index.update(removed=[entry_for(path, self.name).qualified_path])
+        self.maintenance.schedule()
+
+    def __enter__(self) -> Self:
+        """Enter the context manager and start the write-behind queue.
+
+        Returns:
+            Self: The service instance.
+        """
+        self.writer.__enter__()
+        self.maintenance.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        """Exit the context manager, persisting queued changes.
+
+        Returns:
+            False to propagate exceptions.
+        """
+        self.maintenance.__exit__(exc_type, exc_val, exc_tb)
+        self.writer.__exit__(exc_type, exc_val, exc_tb)
+        self.metadata.__exit__(exc_type, exc_val, exc_tb)
+        return False
@@ -0,0 +1,408 @@
+"""Multi-store support for GTKPass.
+
+Several password stores (e.g. personal, team and ops) can be used side by
+side. Each store is scanned on its own worker thread and merged into one
+:class:`EntryIndex` whose keys are store-qualified paths such as
+``team:work/github``, so a slow store never holds up the others.
+"""
+
+import configparser
+import logging
+import os
+import threading
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Self
+
+from gtkpass.models.password import Password
+from gtkpass.services.background import BackgroundService
+from gtkpass.services.gpg import GPGService
+from gtkpass.services.index import EntryIndex
+from gtkpass.services.keyhealth import KeyHealthService, KeyWarning
+from gtkpass.services.store import (
+    PasswordStoreService,
+    default_store_path,
+    entry_for,
+)
+from gtkpass.services.sync import SyncResult, SyncService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StoreConfig:
+    """Configuration of one password store."""
+
+    name: Optional[str]
+    """Name qualifying the entry paths; None for the single implicit store"""
+
+    path: Path
+    """Root directory of the store"""
+
+
+def config_path() -> Path:
+    """Return the location of the store configuration file."""
+    config_home = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+    return Path(config_home) / "gtkpass" / "stores.ini"
+
+
+def load_store_configs(path: Optional[Path] = None) -> list[StoreConfig]:
+    """Load the configured stores.
+
+    The configuration file has one section per store::
+
+        [personal]
+        path = ~/.password-store
+
+        [team]
+        path = /mnt/team/password-store
+
+    ``PASSWORD_STORE_DIR`` takes precedence like it does for ``pass``. Without
+    either, the default store is used as a single unnamed store.
+
+    Args:
+        path: Configuration file to read; defaults to :func:`config_path`.
+
+    Returns:
+        The configured stores in file order.
+    """
+    if os.environ.get("PASSWORD_STORE_DIR"):
+        return [StoreConfig(None, default_store_path())]
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(path or config_path())
+    configs = [
+        StoreConfig(name, Path(section["path"]).expanduser())
+        for name, section in parser.items()
+        if name != configparser.DEFAULTSECT and "path" in section
+    ]
+    return configs or [StoreConfig(None, default_store_path())]
+
+
+class MultiStoreService:
+    """Service scanning several password stores into one merged index.
+
+    Every store gets a worker of its own, so refreshing a slow (e.g. network
+    mounted) store never delays the others.
+
+    Example:
+        with MultiStoreService(load_store_configs()) as stores:
+            stores.wait(stores.refresh())
+            print(stores.index.search(["github"]))
+    """
+
+    def __init__(
+        self,
+        configs: Iterable[StoreConfig],
+        gpg: Optional[GPGService] = None,
+        metadata: bool = False,
+        check_keys: bool = False,
+    ):
+        """
+        Initialize the multi-store service.
+
+        Args:
+            configs: The stores to use; the first one is the primary store.
+            gpg: GPG service shared by all stores.
+            metadata: Whether to use the encrypted metadata cache: a refresh
+                loads it (one gpg call) and decrypts the entries missing from
+                it to fill in their subtitles. Headless callers leave this off
+                so they never run gpg just for listing.
+            check_keys: Whether a refresh also checks the recipient keys of
+                the store and logs the problems found (REQ-LIFE-012).
+        """
+        gpg = gpg or GPGService()
+        self.stores: dict[Optional[str], PasswordStoreService] = {
+            config.name: PasswordStoreService(config.path, gpg, name=config.name)
+            for config in configs
+        }
+        self.index = EntryIndex()
+        self.metadata = metadata
+        self.check_keys = check_keys
+        self.health = KeyHealthService(gpg)
+        self.key_warnings: dict[Optional[str], list[KeyWarning]] = {}
+        self._lock = threading.Lock()
+        self._pending: dict[Optional[str], Future] = {}
+        self._syncing: dict[Optional[str], Future] = {}
+        self._listeners: list[Callable[[Optional[str]], None]] = []
+        self._workers = {name: BackgroundService(max_workers=1) for name in self.stores}
+
+    @property
+    def primary(self) -> PasswordStoreService:
+        """The first configured store."""
+        return next(iter(self.stores.values()))
+
+    def add_listener(self, callback: Callable[[Optional[str]], None]) -> None:
+        """Register a callback invoked after a store was merged into the index.
+
+        The callback receives the store name and runs on a worker thread.
+        """
+        self._listeners.append(callback)
+
+    def resolve(self, qualified_path: str) -> tuple[PasswordStoreService, str]:
+        """Split a qualified path into its store and store path.
+
+        Paths without a known store prefix refer to the primary store.
+
+        Args:
+            qualified_path: A path like ``team:work/github`` or ``work/github``.
+
+        Returns:
+            The store service and the path within that store.
+        """
+        name, sep, path = qualified_path.partition(":")
+        if sep and name in self.stores:
+            return self.stores[name], path
+        return self.primary, qualified_path
+
+    def qualify(self, path: str) -> str:
+        """Return the index key of a path, which may lack its store prefix.
+
+        Args:
+            path: A path like ``team:work/github`` or ``work/github``.
+
+        Returns:
+            The qualified path as used by :attr:`index`.
+        """
+        store, store_path = self.resolve(path)
+        return entry_for(store_path, store.name).qualified_path
+
+    def get_password(self, qualified_path: str) -> Password:
+        """Decrypt an entry of any store.
+
+        Args:
+            qualified_path: A path like ``team:work/github``.
+
+        Returns:
+            The decrypted password.
+        """
+        store, path = self.resolve(qualified_path)
+        return store.get_password(path)
+
+    def warm(self, qualified_paths: Iterable[str]) -> list[Future]:
+        """Read the files of entries ahead of use, one worker per store.
+
+        Args:
+            qualified_paths: Paths like ``team:work/github``.
+
+        Returns:
+            Futures completing when the respective store is warmed.
+        """
+        by_store: dict[Optional[str], list[str]] = {}
+        for qualified_path in qualified_paths:
+            store, path = self.resolve(qualified_path)
+            by_store.setdefault(store.name, []).append(path)
+        return [
+            self._workers[name].submit(self.stores[name].warm, paths)
+            for name, paths in by_store.items()
+        ]
+
+    def save_password(
+        self, qualified_path: str, password: Password, message: Optional[str] = None
+    ) -> None:
+        """Encrypt an entry of any store and queue it for writing.
+
+        Args:
+            qualified_path: A path like ``team:work/github``.
+            password: The entry contents.
+            message: Commit message for the change.
+        """
+        store, path = self.resolve(qualified_path)
+        store.save_password(replace(password, path=Path(path)), message)
+        self.index.update(
+            added=[store.index.get(entry_for(path, store.name).qualified_path)]
+        )
+
+    def delete_password(self, qualified_path: str, message: Optional[str] = None):
+        """Queue the removal of an entry of any store.
+
+        Args:
+            qualified_path: A path like ``team:work/github``.
+            message: Commit message for the change.
+        """
+        store, path = self.resolve(qualified_path)
+        store.delete_password(path, message)
+        self.index.update(removed=[entry_for(path, store.name).qualified_path])
+
+    def refresh(self, *names: Optional[str]) -> list[Future]:
+        """Rescan stores in the background and merge them into the index.
+
+        Each store has a single worker, so scans and pulls of the same store
+        never overlap. A store that is queued for a scan that has not
+        started yet is not queued again; a scan already running may have
+        missed the change, so another one is queued after it.
+
+        Args:
+            *names: The stores to refresh; all stores when omitted.
+
+        Returns:
+            Futures completing when the respective store has been merged.
+        """
+        futures = []
+        with self._lock:
+            for store_name in names or list(self.stores):
+                futures.append(
+                    self._submit(self._pending, store_name, self._refresh_store)
+                )
+        return futures
+
+    def sync(self, *names: Optional[str]) -> list[Future]:
+        """Pull stores in the background and apply what changed to the index.
+
+        Pulls run on the store's worker, after any scan or pull queued
+        before; a store whose pull is queued but has not started yet is not
+        queued again.
+
+        Args:
+            *names: The stores to pull; all stores under git when omitted.
+
+        Returns:
+            Futures resolving to the :class:`SyncResult` of each store.
+        """
+        names = names or tuple(
+            name for name, store in self.stores.items() if store.git.is_repository()
+        )
+        futures = []
+        with self._lock:
+            for store_name in names:
+                futures.append(
+                    self._submit(self._syncing, store_name, self._sync_store)
+                )
+        return futures
+
+    def _submit(
+        self,
+        queued: dict[Optional[str], Future],
+        name: Optional[str],
+        task: Callable[[Optional[str]], object],
+    ) -> Future:
+        """Queue a task on a store's worker unless it is queued and not started.
+
+        Must be called with the lock held.
+        """
+        future = queued.get(name)
+        if future is None or future.running() or future.done():
+            future = self._workers[name].submit(task, name)
+            queued[name] = future
+        return future
+
+    def wait(self, futures: Optional[list[Future]] = None) -> None:
+        """Block until the given (or all pending) refreshes and pulls finish.
+
+        Failures are not raised; they are left in the futures.
+        """
+        if futures is None:
+            with self._lock:
+                futures = [*self._pending.values(), *self._syncing.values()]
+        wait(futures)
+
+    def _refresh_store(self, name: Optional[str]) -> None:
+        """Scan one store and swap its entries in the merged index."""
+        store = self.stores[name]
+        if self.metadata:
+            store.metadata.load()
+        old = set(store.index.search([]))
+        new_index = store.scan()
+        self.index.update(
+            added=new_index.entries(),
+            removed=old.difference(new_index.search([])),
+        )
+        logger.info(f"Store {name or store.store_path} indexed: {len(new_index)}")
+        self._notify(name)
+        if self.metadata and (updated := store.fill_metadata()):
+            self.index.update(added=updated)
+            self._notify(name)
+        if self.check_keys:
+            self.check_store_keys(name)
+        store.maintenance.schedule()
+
+    def check_store_keys(self, name: Optional[str]) -> list[KeyWarning]:
+        """Check the recipient keys of a store and log the problems found.
+
+        Args:
+            name: The store to check.
+
+        Returns:
+            The warnings, also kept in :attr:`key_warnings`.
+        """
+        store = self.stores[name]
+        warnings = self.health.check(store.recipients)
+        for warning in warnings:
+            expires = f", expires {warning.expires:%Y-%m-%d}" if warning.expires else ""
+            logger.warning(
+                f"Store {name or store.store_path}: recipient {warning.recipient} "
+                f"is {warning.problem.value}{expires} "
+                f"(used in {', '.join(d or '/' for d in warning.directories)})"
+            )
+        self.key_warnings[name] = warnings
+        return warnings
+
+    def _sync_store(self, name: Optional[str]) -> SyncResult:
+        """Pull one store and merge the delta into the index."""
+        store = self.stores[name]
+        old = set(store.index.search([]))
+        result = SyncService(store).pull()
+        if not result.updated:
+            return result
+        if result.rescanned:
+            self.index.update(
+                added=store.index.entries(),
+                removed=old.difference(store.index.search([])),
+            )
+        else:
+            self.index.update(
+                added=[
+                    store.index.get(entry_for(path, name).qualified_path)
+                    for path in result.changed
+                ],
+                removed=[
+                    entry_for(path, name).qualified_path for path in result.removed
+                ],
+            )
+        self._notify(name)
+        if self.metadata and (updated := store.fill_metadata()):
+            self.index.update(added=updated)
+            self._notify(name)
+        if self.check_keys:
+            self.check_store_keys(name)
+        store.maintenance.schedule()
+        return result
+
+    def _notify(self, name: Optional[str]) -> None:
+        """Invoke the listeners after a store changed in the index."""
+        for callback in self._listeners:
+            callback(name)
+
+    def __enter__(self) -> Self:
+        """Enter the context manager and start the store workers.
+
+        Returns:
+            Self: The initialized service instance.
+        """
+        for worker in self._workers.values():
+            worker.__enter__()
+        for store in self.stores.values():
+            store.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        """Exit the context manager, waiting for scans and queued writes.
+
+        Every store is exited even if persisting another one fails; the
+        first failure is raised afterwards.
+
+        Returns:
+            False to propagate exceptions.
+        """
+        for worker in self._workers.values():
+            worker.__exit__(exc_type, exc_val, exc_tb)
+        errors = []
+        for store in self.stores.values():
+            try:
+                store.__exit__(exc_type, exc_val, exc_tb)
+            except Exception as e:
+                logger.error(f"Closing store {store.name or store.store_path}: {e}")
+                errors.append(e)
+        if errors:
+            raise errors[0]
+        return False
@@ -0,0 +1,151 @@
+"""Git synchronization service for GTKPass.
+
+Pulls and pushes the git repository of a password store (REQ-PS-013/014).
+After a pull, the commits before and after are compared with
+``git diff-tree`` and only the files that changed are applied to the store's
+index and caches. A full rescan is only needed when the pull rewrote the
+local history, so the previous HEAD is no longer an ancestor.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Optional, Self
+
+from gtkpass.services.git import GitError
+from gtkpass.services.store import PasswordStoreService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncResult:
+    """Outcome of a pull."""
+
+    before: Optional[str]
+    """HEAD before the pull, None for an unborn branch"""
+
+    after: Optional[str]
+    """HEAD after the pull"""
+
+    rescanned: bool = False
+    """Whether the store had to be rescanned instead of updated"""
+
+    changed: list[str] = field(default_factory=list)
+    """Store paths of added or modified entries"""
+
+    removed: list[str] = field(default_factory=list)
+    """Store paths of deleted entries"""
+
+    @property
+    def updated(self) -> bool:
+        """Whether the pull brought in any commits."""
+        return self.before != self.after
+
+
+def parse_name_status(output: str) -> tuple[list[str], list[str]]:
+    """Split ``git diff-tree -r --name-status -z`` output into file lists.
+
+    Args:
+        output: NUL separated status letters and paths.
+
+    Returns:
+        The added or modified and the deleted files.
+    """
+    fields = output.split("\0")
+    changed, removed = [], []
+    for status, path in zip(fields[::2], fields[1::2]):
+        (removed if status == "D" else changed).append(path)
+    return changed, removed
+
+
+class SyncService:
+    """Service pulling and pushing the git repository of a store.
+
+    Example:
+        with SyncService(store) as sync:
+            result = sync.pull()
+    """
+
+    def __init__(self, store: PasswordStoreService):
+        """
+        Initialize the sync service.
+
+        Args:
+            store: The store whose repository is synchronized.
+        """
+        self.store = store
+        self.git = store.git
+
+    def _is_ancestor(self, commit: str, descendant: str) -> bool:
+        """Whether a commit is reachable from another one."""
+        try:
+            self.git.run("merge-base", "--is-ancestor", commit, descendant)
+        except GitError:
+            return False
+        return True
+
+    def pull(self) -> SyncResult:
+        """Pull from the remote and update the store incrementally.
+
+        Queued changes are committed first, so they take part in the merge.
+
+        Returns:
+            What the pull changed.
+
+        Raises:
+            GitError: If the store is not a repository or the pull fails.
+        """
+        self.store.writer.flush()
+        before = self.git.head()
+        self.git.run("pull", "--quiet", "--no-edit")
+        result = SyncResult(before, self.git.head())
+        if not result.updated:
+            return result
+        if before is None or not self._is_ancestor(before, result.after):
+            logger.info(f"History of {self.store.store_path} was rewritten, rescan")
+            self.store.scan()
+            result.rescanned = True
+            return result
+
+        output = self.git.run(
+            "diff-tree",
+            "-r",
+            "--name-status",
+            "--no-renames",
+            "-z",
+            before,
+            result.after,
+        )
+        result.changed, result.removed = self.store.apply_changes(
+            *parse_name_status(output)
+        )
+        logger.info(
+            f"Pulled {before[:7]}..{result.after[:7]}: "
+            f"{len(result.changed)} changed, {len(result.removed)} removed"
+        )
+        return result
+
+    def push(self) -> None:
+        """Commit queued changes and push them to the remote.
+
+        Raises:
+            GitError: If the store is not a repository or the push fails.
+        """
+        self.store.writer.flush()
+        self.git.run("push", "--quiet")
+
+    def __enter__(self) -> Self:
+        """Enter the context manager.
+
+        Returns:
+            Self: The service instance.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        """Exit the context manager.
+
+        Returns:
+            False to propagate exceptions.
+        """
+        return False
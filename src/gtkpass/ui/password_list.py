@@ -9,7 +9,22 @@ import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 
-from gi.repository import Adw, Gtk  # noqa: E402
+from gi.repository import Adw, GObject, Gtk  # noqa: E402
+
+from gtkpass.models.password import PasswordEntry  # noqa: E402
+
+
+class PasswordEntryItem(GObject.Object):
+    """List model item holding an entry of the store index."""
+
+    def __init__(self, entry: PasswordEntry):
+        """Initialize the item.
+
+        Args:
+            entry: The entry shown by the item's row.
+        """
+        super().__init__()
+        self.entry = entry
 
 
 class PasswordListRow(Adw.ActionRow):
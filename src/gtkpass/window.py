@@ -1,5 +1,7 @@
 """Main application window."""
 
+from typing import Optional
+
 import gi
 
 gi.require_version("Gtk", "4.0")
@@ -7,6 +9,10 @@ gi.require_version("Adw", "1")
 
 from gi.repository import Adw, Gio, Gtk  # noqa: E402
 
+from gtkpass.models.password import PasswordEntry  # noqa: E402
+from gtkpass.services.index import splices  # noqa: E402
+from gtkpass.ui.password_list import PasswordEntryItem, PasswordListRow  # noqa: E402
+
 
 @Gtk.Template(filename="src/gtkpass/ui/blueprints/window.ui")
 class GTKPassWindow(Adw.ApplicationWindow):
@@ -32,6 +38,9 @@ class GTKPassWindow(Adw.ApplicationWindow):
     def __init__(self, **kwargs):
         """Initialize the main window."""
         super().__init__(**kwargs)
+        self._pending_path: Optional[str] = None
+        self._model = Gio.ListStore(item_type=PasswordEntryItem)
+        self._keys: list[tuple[str, Optional[str]]] = []
         self._setup_actions()
         self._setup_password_list()
 
@@ -43,26 +52,69 @@ class GTKPassWindow(Adw.ApplicationWindow):
         self.add_action(add_action)
 
     def _setup_password_list(self):
-        """Set up the password list with placeholder data."""
-        # Add placeholder rows to demonstrate the UI
-        # In a real implementation, these would come from the password store
-        placeholder_passwords = [
-            ("GitHub", "github.com/username"),
-            ("Email", "user@example.com"),
-            ("Bank", "mybank.com"),
-            ("Social Media", "social.example.com"),
-        ]
-
-        for name, detail in placeholder_passwords:
-            row = Adw.ActionRow(
-                title=name,
-                subtitle=detail,
-            )
-            row.add_suffix(Gtk.Image.new_from_icon_name("go-next-symbolic"))
-            self.password_list.append(row)
+        """Bind the password list to a list model of the store index.
 
-        # Connect selection handler
+        The search entry filters the list through the index.
+        """
+        self.password_list.bind_model(self._model, self._create_row)
+        self.password_list.set_placeholder(Gtk.Label(label="No passwords"))
+
+        # Connect selection and search handlers
         self.password_list.connect("row-selected", self._on_password_selected)
+        self.search_entry.connect("search-changed", lambda *_: self.refresh())
+
+        self.refresh()
+
+    def _create_row(self, item: PasswordEntryItem) -> PasswordListRow:
+        """Create the row showing a list model item."""
+        entry = item.entry
+        row = PasswordListRow(entry.name, entry.subtitle or entry.qualified_path)
+        row.password_path = entry.qualified_path
+        return row
+
+    def refresh(self):
+        """Show the indexed entries matching the search text."""
+        index = self.get_application().stores.index
+        terms = self.search_entry.get_text().split()
+        entries = (index.get(path) for path in index.search(terms))
+        self.set_entries([entry for entry in entries if entry is not None])
+
+    def set_entries(self, entries: list[PasswordEntry]):
+        """Update the password list to show the given entries.
+
+        Only the differences are spliced into the list model, so rows of
+        unchanged entries, the selection and the scroll position are kept.
+
+        Args:
+            entries: Entries to display, in display order.
+        """
+        keys = [(entry.qualified_path, entry.subtitle) for entry in entries]
+        for position, removals, start, end in splices(self._keys, keys):
+            self._model.splice(
+                position,
+                removals,
+                [PasswordEntryItem(entry) for entry in entries[start:end]],
+            )
+        self._keys = keys
+        if self._pending_path is not None:
+            self.show_entry(self._pending_path)
+
+    def show_entry(self, path: str):
+        """Select the row of an entry.
+
+        If the entry is not listed yet, it is selected once the store
+        index has been loaded.
+
+        Args:
+            path: Qualified path of the entry, e.g. ``team:work/github``.
+        """
+        self._pending_path = path
+        for position, (shown, _) in enumerate(self._keys):
+            if shown == path:
+                row = self.password_list.get_row_at_index(position)
+                self.password_list.select_row(row)
+                self._pending_path = None
+                return
 
     def _on_add_password(self, action, param):
         """Handle add password button click."""
@@ -80,6 +132,10 @@ class GTKPassWindow(Adw.ApplicationWindow):
         if row is None:
             return
 
+        path = getattr(row, "password_path", None)
+        if path is not None and path != self._pending_path:
+            self.get_application().frecency.record(path, "open")
+
         # Placeholder - will show actual password details in future
         # For now, just demonstrate the interaction
         # This is where we would show the detail view
@@ -1,5 +1,9 @@
 """Test configuration and fixtures."""
 
+import shutil
+import subprocess
+from pathlib import Path
+
 import pytest
 
 
@@ -7,3 +11,92 @@ import pytest
 def sample_data():
     """Provide sample test data."""
     return {"test": "data"}
+
+
+@pytest.fixture(scope="session")
+def gpg_home(tmp_path_factory):
+    """Provide a GNUPGHOME with a passphrase-less test key.
+
+    Returns:
+        Tuple of the home directory and the fingerprint of the key.
+    """
+    if shutil.which("gpg") is None:
+        pytest.skip("gpg not available")
+    home = tmp_path_factory.mktemp("gnupg")
+    home.chmod(0o700)
+    subprocess.run(
+        [
+            "gpg",
+            "--batch",
+            "--homedir",
+            str(home),
+            "--passphrase",
+            "",
+            "--quick-gen-key",
+            "GTKPass Test <test@example.com>",
+            "future-default",
+            "default",
+            "never",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    listing = subprocess.run(
+        ["gpg", "--batch", "--homedir", str(home), "--with-colons", "--list-keys"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    fingerprint = next(
+        line.split(":")[9] for line in listing.splitlines() if line.startswith("fpr:")
+    )
+    yield home, fingerprint
+    subprocess.run(["gpgconf", "--homedir", str(home), "--kill", "gpg-agent"])
+
+
+@pytest.fixture
+def password_store(tmp_path, gpg_home, monkeypatch):
+    """Provide a small password store encrypted to the test key."""
+    home, fingerprint = gpg_home
+    monkeypatch.setenv("GNUPGHOME", str(home))
+    store = tmp_path / "store"
+    store.mkdir()
+    monkeypatch.setenv("PASSWORD_STORE_DIR", str(store))
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    (store / ".gpg-id").write_text(f"{fingerprint}\n")
+    entries = {
+        "work/github": "s3cret\nusername: octocat\nurl: https://github.com\n",
+        "work/vpn": "vpnpass\n",
+        "personal/bank": "hunter2\nlogin: me\n",
+    }
+    for path, content in entries.items():
+        target = store / f"{path}.gpg"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(
+            [
+                "gpg",
+                "--batch",
+                "--homedir",
+                str(home),
+                "--trust-model",
+                "always",
+                "--encrypt",
+                "--recipient",
+                fingerprint,
+                "--output",
+                str(target),
+            ],
+            input=content.encode(),
+            check=True,
+            capture_output=True,
+        )
+    return Path(store)
+
+
+@pytest.fixture
+def git_identity(monkeypatch):
+    """Provide a git author and committer identity."""
+    for variable in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{variable}_NAME", "GTKPass Test")
+        monkeypatch.setenv(f"GIT_{variable}_EMAIL", "test@example.com")
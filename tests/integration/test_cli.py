@@ -0,0 +1,137 @@
+"""Integration tests for the headless command line interface."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import gtkpass
+from gtkpass.services.store import PasswordStoreService
+
+COLD_START_BUDGET = 0.5
+"""Maximum wall time in seconds for a complete ``gtkpass ls`` run"""
+
+SRC_DIR = Path(gtkpass.__file__).parent.parent
+
+
+def run_gtkpass(*args: str, code: str = "") -> subprocess.CompletedProcess:
+    """Run ``python -m gtkpass`` in a fresh interpreter."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(SRC_DIR), env.get("PYTHONPATH")])
+    )
+    command = [sys.executable, "-m", "gtkpass", *args]
+    if code:
+        command = [sys.executable, "-c", code, *args]
+    return subprocess.run(command, env=env, capture_output=True, text=True)
+
+
+@pytest.mark.integration
+class TestHeadlessCLI:
+    """Test the GTK-free query commands."""
+
+    def test_import_graph_is_gtk_free(self, password_store):
+        """Test that running the query commands never imports gi."""
+        code = (
+            "import sys\n"
+            "from gtkpass.__main__ import main\n"
+            "sys.argv = ['gtkpass', *sys.argv[1:]]\n"
+            "main()\n"
+            "gtk = sorted(m for m in sys.modules if m == 'gi' or m.startswith('gi.'))\n"
+            "assert not gtk, gtk\n"
+        )
+        for args in (["ls"], ["find", "work"], ["show", "work/vpn"]):
+            result = run_gtkpass(*args, code=code)
+            assert result.returncode == 0, result.stderr
+
+    def test_cold_start_budget(self, password_store):
+        """Test that a cold ``gtkpass ls`` stays within the startup budget."""
+        run_gtkpass("ls")  # warm the filesystem cache, not the interpreter
+        start = time.perf_counter()
+        result = run_gtkpass("ls")
+        elapsed = time.perf_counter() - start
+
+        assert result.returncode == 0, result.stderr
+        assert elapsed < COLD_START_BUDGET
+
+    def test_ls(self, password_store):
+        """Test listing all entries."""
+        result = run_gtkpass("ls")
+        assert result.stdout.split() == ["personal/bank", "work/github", "work/vpn"]
+
+    def test_find_json(self, password_store):
+        """Test searching with JSON output."""
+        result = run_gtkpass("find", "work", "git", "--json")
+        assert json.loads(result.stdout) == [
+            {"name": "github", "path": "work/github", "subtitle": None, "store": None}
+        ]
+
+    def test_show(self, password_store):
+        """Test that show prints the password."""
+        result = run_gtkpass("show", "work/github")
+        assert result.stdout == "s3cret\n"
+
+    def test_show_json(self, password_store):
+        """Test that show --json serializes the entry without the password."""
+        result = run_gtkpass("show", "work/github", "--json")
+        data = json.loads(result.stdout)
+
+        assert data["username"] == "octocat"
+        assert data["path"] == "work/github"
+        assert "s3cret" not in result.stdout
+
+    def test_listing_never_runs_gpg(self, password_store, tmp_path, monkeypatch):
+        """Test that ls and find leave an existing metadata cache alone."""
+        with PasswordStoreService(password_store) as store:
+            store.scan()
+            store.fill_metadata()
+        assert store.metadata.path.exists()
+        calls = tmp_path / "gpg-calls"
+        wrapper = tmp_path / "bin" / "gpg"
+        wrapper.parent.mkdir()
+        wrapper.write_text(
+            f'#!/bin/sh\necho "$@" >> {calls}\nexec {shutil.which("gpg")} "$@"\n'
+        )
+        wrapper.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{wrapper.parent}{os.pathsep}{os.environ['PATH']}")
+
+        assert run_gtkpass("ls").returncode == 0
+        assert run_gtkpass("find", "octocat").returncode == 0
+        assert not calls.exists()
+        assert run_gtkpass("show", "work/vpn").stdout == "vpnpass\n"
+        assert calls.exists()
+
+    def test_show_records_qualified_path(self, password_store, tmp_path, monkeypatch):
+        """Test that show ranks the entry under its store-qualified path."""
+        monkeypatch.delenv("PASSWORD_STORE_DIR")
+        monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+        (tmp_path / "config" / "gtkpass").mkdir(parents=True)
+        (tmp_path / "config" / "gtkpass" / "stores.ini").write_text(
+            f"[personal]\npath = {password_store}\n"
+        )
+
+        assert run_gtkpass("show", "work/vpn").stdout == "vpnpass\n"
+        assert run_gtkpass("ls").stdout.split()[0] == "personal:work/vpn"
+
+    def test_show_missing(self, password_store):
+        """Test that a missing entry fails with an error message."""
+        result = run_gtkpass("show", "missing")
+        assert result.returncode == 1
+        assert "not in the password store" in result.stderr
+
+    def test_unreadable_store(self, tmp_path, monkeypatch):
+        """Test that a store that cannot be scanned fails the query."""
+        store = tmp_path / "store"
+        store.write_text("not a directory")
+        monkeypatch.setenv("PASSWORD_STORE_DIR", str(store))
+        monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+
+        for args in (["ls"], ["find", "x", "--json"]):
+            result = run_gtkpass(*args)
+            assert result.returncode == 1
+            assert f"failed to read store {store}" in result.stderr
@@ -0,0 +1,156 @@
+"""Integration tests for the GNOME Shell search provider.
+
+The provider is exported on a private ``dbus-daemon`` so the tests never
+touch the user's session bus.
+"""
+
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from gtkpass.models.password import PasswordEntry
+from gtkpass.services.index import EntryIndex
+
+Gio = pytest.importorskip("gi.repository.Gio")
+GLib = pytest.importorskip("gi.repository.GLib")
+
+OBJECT_PATH = "/io/github/ronnypfannschmidt/GTKPass"
+INTERFACE = "org.gnome.Shell.SearchProvider2"
+
+
+@pytest.fixture
+def private_bus():
+    """Start a private session bus and return its address."""
+    if shutil.which("dbus-daemon") is None:
+        pytest.skip("dbus-daemon not available")
+    daemon = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    address = daemon.stdout.readline().strip()
+    yield address
+    daemon.terminate()
+    daemon.wait()
+
+
+def connect(address: str) -> "Gio.DBusConnection":
+    """Open a message bus connection to the given address."""
+    return Gio.DBusConnection.new_for_address_sync(
+        address,
+        Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT
+        | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+        None,
+        None,
+    )
+
+
+@pytest.fixture
+def provider_bus_name(private_bus):
+    """Export a search provider from a service thread on the private bus."""
+    from gtkpass.search_provider import SearchProvider
+
+    paths = [f"work/site{i}" for i in range(5000)] + ["work/github", "home/git"]
+    index = EntryIndex(
+        PasswordEntry(name=p.rpartition("/")[2], path=Path(p)) for p in paths
+    )
+    ready = threading.Event()
+    state = {}
+
+    def serve():
+        context = GLib.MainContext.new()
+        context.push_thread_default()
+        connection = connect(private_bus)
+        SearchProvider(index).register(connection, OBJECT_PATH)
+        state["name"] = connection.get_unique_name()
+        state["loop"] = loop = GLib.MainLoop.new(context, False)
+        ready.set()
+        loop.run()
+        context.pop_thread_default()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    ready.wait(timeout=5)
+    yield state["name"]
+    state["loop"].quit()
+    thread.join(timeout=5)
+
+
+@pytest.mark.integration
+class TestSearchProvider:
+    """Test the search provider over D-Bus."""
+
+    def call(self, address, bus_name, method, parameters, reply_type):
+        """Call a provider method and return the unpacked reply."""
+        connection = connect(address)
+        reply = connection.call_sync(
+            bus_name,
+            OBJECT_PATH + "/SearchProvider",
+            INTERFACE,
+            method,
+            parameters,
+            GLib.VariantType.new(reply_type),
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None,
+        )
+        return reply.unpack()
+
+    def test_initial_and_subsearch(self, private_bus, provider_bus_name):
+        """Test that initial and subsearch result sets are served."""
+        (results,) = self.call(
+            private_bus,
+            provider_bus_name,
+            "GetInitialResultSet",
+            GLib.Variant("(as)", (["git"],)),
+            "(as)",
+        )
+        assert results == ["home/git", "work/github"]
+
+        (narrowed,) = self.call(
+            private_bus,
+            provider_bus_name,
+            "GetSubsearchResultSet",
+            GLib.Variant("(asas)", (results, ["git", "hub"])),
+            "(as)",
+        )
+        assert narrowed == ["work/github"]
+
+    def test_result_metas(self, private_bus, provider_bus_name):
+        """Test that result metas describe the entries."""
+        (metas,) = self.call(
+            private_bus,
+            provider_bus_name,
+            "GetResultMetas",
+            GLib.Variant("(as)", (["work/github"],)),
+            "(aa{sv})",
+        )
+        assert metas == [
+            {"id": "work/github", "name": "github", "description": "work/github"}
+        ]
+
+    def test_latency(self, private_bus, provider_bus_name):
+        """Test that queries on a large index answer in single-digit ms."""
+        connection = connect(private_bus)
+        parameters = GLib.Variant("(as)", (["site42"],))
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            connection.call_sync(
+                provider_bus_name,
+                OBJECT_PATH + "/SearchProvider",
+                INTERFACE,
+                "GetInitialResultSet",
+                parameters,
+                GLib.VariantType.new("(as)"),
+                Gio.DBusCallFlags.NONE,
+                -1,
+                None,
+            )
+            timings.append(time.perf_counter() - start)
+
+        assert sorted(timings)[len(timings) // 2] < 0.01
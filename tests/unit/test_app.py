@@ -18,3 +18,133 @@ class TestGTKPassApp:
         app = GTKPassApp()
         assert app is not None
         assert app.window is None  # Window not created until activated
+
+    @pytest.mark.skipif(
+        not pytest.importorskip("gi.repository.Gtk", minversion="4.0"),
+        reason="GTK4 not available",
+    )
+    def test_app_handles_command_line(self):
+        """Test that command lines are forwarded to the primary instance."""
+        from gi.repository import Gio
+
+        from gtkpass.app import GTKPassApp
+
+        app = GTKPassApp()
+        assert app.get_flags() & Gio.ApplicationFlags.HANDLES_COMMAND_LINE
+
+    @pytest.mark.skipif(
+        not pytest.importorskip("gi.repository.Gtk", minversion="4.0"),
+        reason="GTK4 not available",
+    )
+    def test_command_line_dispatch(self):
+        """Test that --show and --copy reach their handlers."""
+        from gi.repository import GLib
+
+        from gtkpass.app import GTKPassApp
+
+        class CommandLine:
+            def __init__(self, **options):
+                self.options = options
+
+            def get_options_dict(self):
+                options = GLib.VariantDict.new(None)
+                for name, value in self.options.items():
+                    options.insert_value(name, GLib.Variant("s", value))
+                return options
+
+        app = GTKPassApp()
+        calls = []
+        app.show_entry = lambda path: calls.append(("show", path))
+        app.copy_entry = lambda path: calls.append(("copy", path))
+        app.activate = lambda: calls.append(("activate", None))
+
+        assert app.do_command_line(CommandLine(show="work/github")) == 0
+        assert app.do_command_line(CommandLine(copy="team:work/vpn")) == 0
+        assert app.do_command_line(CommandLine()) == 0
+        assert calls == [
+            ("show", "work/github"),
+            ("copy", "team:work/vpn"),
+            ("activate", None),
+        ]
+
+    @pytest.mark.skipif(
+        not pytest.importorskip("gi.repository.Gtk", minversion="4.0"),
+        reason="GTK4 not available",
+    )
+    def test_clipboard_is_cleared(self):
+        """Test that a copied password is cleared after the hold time."""
+        from concurrent.futures import Future
+        from pathlib import Path
+
+        from gtkpass.app import GTKPassApp
+        from gtkpass.models.password import Password
+
+        class Clipboard:
+            content = None
+            local = True
+
+            def set(self, value):
+                self.content = value
+
+            def set_content(self, provider):
+                self.content = provider
+
+            def is_local(self):
+                return self.local
+
+        app = GTKPassApp()
+        clipboard = Clipboard()
+        app._clipboard = lambda: clipboard
+        app.release = lambda: None
+
+        def copy(secret):
+            future = Future()
+            future.set_result(Password("github", Path("work/github"), secret))
+            app._on_password_decrypted("work/github", future)
+            return app._clipboard_generation
+
+        first = copy("s3cret")
+        assert clipboard.content == "s3cret"
+        second = copy("other")
+        app._release_clipboard(first)
+        assert clipboard.content == "other"
+        app._release_clipboard(second)
+        assert clipboard.content is None
+
+        copy("s3cret")
+        clipboard.local = False
+        app._release_clipboard(app._clipboard_generation)
+        assert clipboard.content == "s3cret"
+
+    @pytest.mark.skipif(
+        not pytest.importorskip("gi.repository.Gtk", minversion="4.0"),
+        reason="GTK4 not available",
+    )
+    def test_shutdown_releases_every_service(self, monkeypatch):
+        """Test that a failing store does not keep other services open."""
+        from gi.repository import Adw
+
+        from gtkpass.app import GTKPassApp
+
+        class Service:
+            def __init__(self, name, error=None):
+                self.name = name
+                self.error = error
+
+            def __exit__(self, *exc_info):
+                released.append(self.name)
+                if self.error is not None:
+                    raise self.error
+
+        released = []
+        app = GTKPassApp()
+        app.stores = Service("stores", OSError("disk full"))
+        app.background = Service("background")
+        app.frecency = Service("frecency")
+        monkeypatch.setattr(
+            Adw.Application, "do_shutdown", lambda self: released.append("app")
+        )
+
+        with pytest.raises(OSError, match="disk full"):
+            app.do_shutdown()
+        assert released == ["stores", "background", "frecency", "app"]
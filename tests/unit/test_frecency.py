@@ -0,0 +1,82 @@
+"""Unit tests for the frecency ranking service."""
+
+import json
+import time
+
+import pytest
+
+from gtkpass.services.frecency import DEFAULT_HALF_LIFE, FrecencyService
+
+NOW = time.time()
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Provide the path of a fresh frecency database."""
+    return tmp_path / "frecency.json"
+
+
+@pytest.mark.unit
+class TestFrecencyService:
+    """Test cases for FrecencyService."""
+
+    def test_score_decays(self, database):
+        """Test that a use counts half after one half-life."""
+        frecency = FrecencyService(database)
+        frecency.record("a", "open", now=NOW)
+
+        assert frecency.score("a", now=NOW) == pytest.approx(1.0)
+        assert frecency.score("a", now=NOW + DEFAULT_HALF_LIFE) == pytest.approx(0.5)
+        assert frecency.score("unused", now=NOW) == 0.0
+
+    def test_recent_beats_old_frequent(self, database):
+        """Test that the ranking balances frequency and recency."""
+        frecency = FrecencyService(database)
+        for _ in range(3):
+            frecency.record("old", "open", now=NOW - 3 * DEFAULT_HALF_LIFE)
+        frecency.record("recent", "open", now=NOW)
+        frecency.record("copied", "copy", now=NOW)
+
+        assert frecency.rank(["unused", "old", "recent", "copied"]) == [
+            "copied",
+            "recent",
+            "old",
+            "unused",
+        ]
+        assert frecency.top(2) == ["copied", "recent"]
+
+    def test_writes_are_batched(self, database):
+        """Test that recording does not write until saved."""
+        with FrecencyService(database, save_delay=60) as frecency:
+            for _ in range(100):
+                frecency.record("a", "copy")
+            assert not database.exists()
+
+        reloaded = FrecencyService(database)
+        assert reloaded.key("a") == frecency.key("a")
+        assert json.loads(database.read_text())["version"] == 1
+
+    def test_delayed_save(self, database):
+        """Test that recorded uses are saved after the save delay."""
+        frecency = FrecencyService(database, save_delay=0.01)
+        frecency.record("a")
+        deadline = time.monotonic() + 5
+        while not database.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert "a" in json.loads(database.read_text())["scores"]
+
+    def test_forget_and_prune(self, database):
+        """Test that deleted and long unused entries are dropped."""
+        with FrecencyService(database) as frecency:
+            frecency.record("deleted")
+            frecency.record("ancient", now=NOW - 20 * DEFAULT_HALF_LIFE)
+            frecency.record("kept")
+            frecency.forget("deleted")
+
+        assert set(json.loads(database.read_text())["scores"]) == {"kept"}
+
+    def test_corrupt_database(self, database):
+        """Test that an unreadable database starts empty."""
+        database.write_text("{not json")
+        assert FrecencyService(database).top(5) == []
@@ -0,0 +1,98 @@
+"""Unit tests for the in-memory entry index."""
+
+from pathlib import Path
+
+import pytest
+
+from gtkpass.models.password import PasswordEntry
+from gtkpass.services.index import EntryIndex, splices
+
+
+def make_entries(*paths: str) -> list[PasswordEntry]:
+    """Create entries for the given store paths."""
+    return [PasswordEntry(name=p.rpartition("/")[2], path=Path(p)) for p in paths]
+
+
+@pytest.mark.unit
+class TestEntryIndex:
+    """Test cases for EntryIndex."""
+
+    def test_search_matches_all_terms(self):
+        """Test that every term has to match, case-insensitively."""
+        index = EntryIndex(make_entries("work/github", "work/gitlab", "home/git"))
+
+        assert index.search(["git"]) == ["home/git", "work/github", "work/gitlab"]
+        assert index.search(["WORK", "hub"]) == ["work/github"]
+        assert index.search([]) == ["home/git", "work/github", "work/gitlab"]
+
+    def test_search_matches_subtitle(self):
+        """Test that subtitles are searchable."""
+        entry = PasswordEntry(name="mail", path=Path("mail"), subtitle="alice")
+        index = EntryIndex([entry])
+
+        assert index.search(["alice"]) == ["mail"]
+
+    def test_subsearch_within_previous_results(self):
+        """Test that a subsearch only considers the previous result set."""
+        index = EntryIndex(make_entries("work/github", "work/gitlab", "home/git"))
+        previous = index.search(["work"])
+
+        assert index.search(["work", "lab"], within=previous) == ["work/gitlab"]
+        assert index.search(["git"], within=["home/git", "gone"]) == ["home/git"]
+
+    def test_update(self):
+        """Test incremental additions and removals."""
+        index = EntryIndex(make_entries("a", "b"))
+        index.update(added=make_entries("c"), removed=["a"])
+
+        assert [e.path.as_posix() for e in index.entries()] == ["b", "c"]
+        assert "a" not in index
+        assert index.get("c").name == "c"
+
+    def test_ranking(self):
+        """Test that a ranking orders entries and results before the path."""
+        ranks = {"work/vpn": 2.0, "home/git": 1.0}
+        index = EntryIndex(
+            make_entries("work/github", "work/vpn", "home/git", "a"),
+            ranking=lambda path: ranks.get(path, float("-inf")),
+        )
+
+        assert index.search(["git"]) == ["home/git", "work/github"]
+        assert [e.path.as_posix() for e in index.entries()] == [
+            "work/vpn",
+            "home/git",
+            "a",
+            "work/github",
+        ]
+
+
+@pytest.mark.unit
+class TestSplices:
+    """Test cases for the list model splices."""
+
+    @pytest.mark.parametrize(
+        "old, new",
+        [
+            ("abcdef", "abcdef"),
+            ("", "abc"),
+            ("abc", ""),
+            ("abcdef", "abxdef"),
+            ("abcdef", "bcdefg"),
+            ("abcdef", "fabcde"),
+            ("abcdef", "axcyez"),
+        ],
+    )
+    def test_apply(self, old, new):
+        """Test that applying the splices in order yields the new sequence."""
+        model = list(old)
+        for position, removals, start, end in splices(old, new):
+            model[position : position + removals] = new[start:end]
+
+        assert model == list(new)
+
+    def test_unchanged_items_are_kept(self):
+        """Test that a single change only touches its own item."""
+        old = [f"entry{i}" for i in range(1000)]
+        new = old[:500] + ["changed"] + old[501:]
+
+        assert splices(old, new) == [(500, 1, 500, 501)]
@@ -0,0 +1,144 @@
+"""Unit tests for the key health service."""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from gtkpass.services.gpg import parse_colons
+from gtkpass.services.keyhealth import KeyHealthService, KeyProblem
+from gtkpass.services.recipients import RecipientService
+from gtkpass.services.stores import MultiStoreService, StoreConfig
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def key_lines(fingerprint, email, validity="u", expires=None, sub_expires=None):
+    """Build the colon listing of a key with an encryption subkey."""
+
+    def timestamp(moment):
+        return str(int(moment.timestamp())) if moment else ""
+
+    return [
+        f"pub:{validity}:255:22:{fingerprint[-16:]}:1:{timestamp(expires)}::u:::scESC:",
+        f"fpr:::::::::{fingerprint}:",
+        f"uid:{validity}::::1::HASH::{email}::::::::::0:",
+        f"sub:{validity}:255:18:{'0' * 16}:1:{timestamp(sub_expires)}:::::e:",
+        f"fpr:::::::::{'0' * 24}{fingerprint[:16]}:",
+    ]
+
+
+class FakeGPG:
+    """GPG stand-in listing a fixed keyring."""
+
+    def __init__(self, homedir, listing):
+        self.homedir = homedir
+        self.listing = listing
+        self.calls = 0
+
+    def list_keys(self, *specs):
+        self.calls += 1
+        return parse_colons("\n".join(self.listing))
+
+
+@pytest.fixture
+def keyring(tmp_path):
+    """Provide a fake keyring with keys in different states."""
+    home = tmp_path / "gnupg"
+    home.mkdir()
+    (home / "pubring.kbx").write_bytes(b"")
+    listing = [
+        *key_lines("A" * 40, "good@example.com"),
+        *key_lines("B" * 40, "soon@example.com", sub_expires=NOW + timedelta(days=3)),
+        *key_lines("C" * 40, "old@example.com", validity="e", expires=NOW),
+        *key_lines("D" * 40, "meh@example.com", validity="-"),
+        *key_lines("E" * 40, "primary@example.com", expires=NOW + timedelta(days=3)),
+    ]
+    return FakeGPG(home, listing)
+
+
+@pytest.mark.unit
+class TestKeyHealthService:
+    """Test cases for KeyHealthService."""
+
+    def test_parse_expiry(self, keyring):
+        """Test that encryption expiry and validity are parsed."""
+        keys = KeyHealthService(keyring).keys()
+
+        assert keys["A" * 40].encryption_expires is None
+        assert keys["A" * 40].usable and keys["A" * 40].trusted
+        assert keys["B" * 40].encryption_expires == NOW + timedelta(days=3)
+        assert not keys["C" * 40].usable
+        assert keys["E" * 40].encryption_expires is None
+        assert keys["E" * 40].usable_until == NOW + timedelta(days=3)
+
+    def test_keyring_is_cached_until_modified(self, keyring):
+        """Test that gpg is only invoked again after the keyring changed."""
+        health = KeyHealthService(keyring)
+        health.keys()
+        health.find("good@example.com")
+        health.keys()
+        assert keyring.calls == 1
+
+        ring = keyring.homedir / "pubring.kbx"
+        stat = ring.stat()
+        os.utime(ring, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        health.keys()
+        assert keyring.calls == 2
+
+    @pytest.mark.parametrize(
+        "recipient, problem",
+        [
+            ("good@example.com", None),
+            ("A" * 40, None),
+            ("soon@example.com", KeyProblem.EXPIRING),
+            ("old@example.com", KeyProblem.UNUSABLE),
+            ("meh@example.com", KeyProblem.UNTRUSTED),
+            ("primary@example.com", KeyProblem.EXPIRING),
+            ("nobody@example.com", KeyProblem.MISSING),
+        ],
+    )
+    def test_diagnose(self, keyring, recipient, problem):
+        """Test the problem reported for each key state."""
+        assert KeyHealthService(keyring).diagnose(recipient, now=NOW) == problem
+
+    def test_check_store(self, keyring, tmp_path):
+        """Test the store-wide check in a single pass."""
+        store = tmp_path / "store"
+        (store / "team").mkdir(parents=True)
+        (store / ".gpg-id").write_text("good@example.com\nsoon@example.com\n")
+        (store / "team" / ".gpg-id").write_text("soon@example.com\nnobody\n")
+        recipients = RecipientService(store, keyring)
+
+        warnings = KeyHealthService(keyring).check(recipients, now=NOW)
+
+        assert [(w.recipient, w.problem, w.directories) for w in warnings] == [
+            ("nobody", KeyProblem.MISSING, ["team"]),
+            ("soon@example.com", KeyProblem.EXPIRING, ["", "team"]),
+        ]
+        assert warnings[1].expires == NOW + timedelta(days=3)
+        assert keyring.calls == 1
+
+    def test_real_keyring(self, password_store, gpg_home):
+        """Test checking a store against a real keyring."""
+        (password_store / "team").mkdir()
+        (password_store / "team" / ".gpg-id").write_text("missing@example.com\n")
+
+        warnings = KeyHealthService().check(RecipientService(password_store))
+
+        assert [(w.recipient, w.problem) for w in warnings] == [
+            ("missing@example.com", KeyProblem.MISSING)
+        ]
+
+    def test_checked_after_refresh(self, password_store, caplog):
+        """Test that refreshing a store logs its recipient key problems."""
+        (password_store / "team").mkdir()
+        (password_store / "team" / ".gpg-id").write_text("missing@example.com\n")
+        configs = [StoreConfig("own", password_store)]
+
+        with MultiStoreService(configs, check_keys=True) as stores:
+            stores.wait(stores.refresh())
+
+        (warning,) = stores.key_warnings["own"]
+        assert warning.problem == KeyProblem.MISSING
+        assert "missing@example.com is missing (used in team)" in caplog.text
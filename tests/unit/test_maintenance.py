@@ -0,0 +1,127 @@
+"""Unit tests for the git maintenance service."""
+
+import subprocess
+import time
+
+import pytest
+
+from gtkpass.services.git import GitService
+from gtkpass.services.maintenance import (
+    MaintenanceService,
+    RepositoryStats,
+    idle_priority_wrapper,
+)
+
+
+@pytest.fixture
+def repository(tmp_path, git_identity):
+    """Provide a repository with a history of small auto-commits."""
+    subprocess.run(["git", "init", "--quiet", str(tmp_path)], check=True)
+    for number in range(10):
+        (tmp_path / f"entry{number}.gpg").write_bytes(b"%d" % number)
+        subprocess.run(["git", "-C", str(tmp_path), "add", "--all"], check=True)
+        subprocess.run(
+            ["git", "-C", str(tmp_path), "commit", "--quiet", "-m", f"Add {number}"],
+            check=True,
+        )
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestMaintenanceService:
+    """Test cases for MaintenanceService."""
+
+    def test_due_tasks(self):
+        """Test that tasks are due according to the statistics."""
+        assert RepositoryStats(0, 1, commit_graph=True).due_tasks() == []
+        assert RepositoryStats(0, 1, commit_graph=False).due_tasks() == ["commit-graph"]
+        assert RepositoryStats(500, 20, commit_graph=True).due_tasks() == [
+            "loose-objects",
+            "incremental-repack",
+            "commit-graph",
+        ]
+
+    def test_idle_priority(self):
+        """Test that maintenance runs niced."""
+        assert idle_priority_wrapper()[-3:] == ("nice", "-n", "19")
+
+    def test_run(self, repository):
+        """Test that due tasks are run and their effect reported."""
+        maintenance = MaintenanceService(repository, loose_limit=10)
+        stats = maintenance.stats()
+        assert stats.loose_objects == 30
+        assert not stats.commit_graph
+
+        report = maintenance.run()
+
+        assert report.tasks == ["loose-objects", "commit-graph"]
+        assert report.after == RepositoryStats(0, 1, commit_graph=True)
+        assert report.log_before > 0 and report.log_after > 0
+        assert maintenance.run() is None
+        assert maintenance.last_report is report
+
+    def test_incremental_repack(self, repository):
+        """Test that small packs are repacked through a multi-pack-index."""
+        maintenance = MaintenanceService(repository, loose_limit=1000, pack_limit=3)
+        for number in range(4):
+            (repository / f"more{number}.gpg").write_bytes(b"more %d" % number)
+            maintenance.git.commit(f"Add more {number}", [f"more{number}.gpg"])
+            maintenance.git.run("repack", "-d", "--quiet")
+        assert maintenance.stats().packs == 4
+        packs = repository / ".git" / "objects" / "pack"
+        largest = max(packs.glob("*.pack"), key=lambda pack: pack.stat().st_size)
+
+        report = maintenance.run()
+
+        assert report.tasks == ["incremental-repack", "commit-graph"]
+        assert report.after.packs == 5
+        assert (packs / "multi-pack-index").exists()
+        assert maintenance.run(force=True).after.packs < 5
+        assert largest.exists()
+
+    def test_without_commits(self, tmp_path):
+        """Test that an unborn repository is left alone."""
+        subprocess.run(["git", "init", "--quiet", str(tmp_path)], check=True)
+        assert MaintenanceService(tmp_path).run(force=True) is None
+
+    def test_scheduled_when_idle(self, repository):
+        """Test that a scheduled run waits for the idle delay."""
+        with MaintenanceService(repository, idle_delay=0.05) as maintenance:
+            maintenance.schedule()
+            deadline = time.monotonic() + 5
+            while maintenance.last_report is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert maintenance.last_report.tasks == ["commit-graph"]
+
+    def test_exit_cancels(self, repository):
+        """Test that leaving the context cancels a scheduled run."""
+        with MaintenanceService(repository, idle_delay=60) as maintenance:
+            maintenance.schedule()
+
+        assert maintenance._timer is None
+        maintenance.schedule()
+        assert maintenance._timer is None
+
+    def test_exit_interrupts_run(self, repository, tmp_path_factory):
+        """Test that leaving the context stops a running task."""
+        bin_dir = tmp_path_factory.mktemp("bin")
+        git = bin_dir / "git"
+        git.write_text(
+            "#!/bin/sh\n"
+            'case "$*" in *commit-graph*) touch "$0.started"; sleep 60 ;; esac\n'
+            'exec git "$@"\n'
+        )
+        git.chmod(0o755)
+        started = bin_dir / "git.started"
+        with MaintenanceService(repository, idle_delay=0) as maintenance:
+            maintenance.git = GitService(repository, binary=str(git))
+            maintenance.schedule()
+            deadline = time.monotonic() + 5
+            while not started.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert started.exists()
+            start = time.monotonic()
+
+        assert time.monotonic() - start < 5
+        assert maintenance.last_report is None
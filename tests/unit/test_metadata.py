@@ -0,0 +1,129 @@
+"""Unit tests for the encrypted metadata cache."""
+
+from pathlib import Path
+
+import pytest
+
+from gtkpass.models.password import Password
+from gtkpass.services.gpg import GPGService
+from gtkpass.services.metadata import EntryMetadata, MetadataCache, blob_id
+from gtkpass.services.store import PasswordStoreService
+from gtkpass.services.stores import MultiStoreService, StoreConfig
+
+
+class CountingGPG(GPGService):
+    """GPG service counting decryptions."""
+
+    decryptions = 0
+
+    def decrypt(self, data: bytes) -> str:
+        self.decryptions += 1
+        return super().decrypt(data)
+
+
+def subtitles(store: PasswordStoreService) -> dict[str, str]:
+    """Return the subtitles of the indexed entries by path."""
+    return {entry.qualified_path: entry.subtitle for entry in store.index.entries()}
+
+
+@pytest.mark.unit
+class TestMetadataCache:
+    """Test cases for MetadataCache."""
+
+    def test_blob_id(self):
+        """Test that blob hashes match git's object IDs."""
+        assert blob_id(b"") == "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
+
+    def test_subtitle(self):
+        """Test that the subtitle shows the username and URL present."""
+        assert EntryMetadata("me", "https://x").subtitle == "me · https://x"
+        assert EntryMetadata(url="https://x").subtitle == "https://x"
+        assert EntryMetadata().subtitle is None
+
+    def test_fill_and_reuse(self, password_store):
+        """Test that entries are decrypted once and the cache once per session."""
+        gpg = CountingGPG()
+        with PasswordStoreService(password_store, gpg) as store:
+            store.scan()
+            assert store.fill_metadata()
+            assert gpg.decryptions == 3
+            assert store.metadata.path.exists()
+            assert b"octocat" not in store.metadata.path.read_bytes()
+
+        gpg = CountingGPG()
+        with PasswordStoreService(password_store, gpg) as store:
+            store.scan()
+            assert gpg.decryptions == 0
+            assert len(store.fill_metadata()) == 2
+            assert gpg.decryptions == 1
+            assert subtitles(store) == {
+                "personal/bank": "me",
+                "work/github": "octocat · https://github.com",
+                "work/vpn": None,
+            }
+            assert store.search("octocat")[0].qualified_path == "work/github"
+
+    def test_incremental_update(self, password_store):
+        """Test that only changed entries are decrypted again."""
+        with PasswordStoreService(password_store) as store:
+            store.scan()
+            store.fill_metadata()
+            store.save_password(
+                Password("vpn", Path("work/vpn"), "new", username="ops")
+            )
+            assert subtitles(store)["work/vpn"] == "ops"
+        (password_store / "personal").rename(password_store / "private")
+
+        gpg = CountingGPG()
+        with PasswordStoreService(password_store, gpg) as store:
+            store.metadata.load()
+            store.scan()
+            assert store.fill_metadata() == []
+            assert gpg.decryptions == 1
+            assert subtitles(store)["private/bank"] == "me"
+
+    def test_queued_write(self, password_store):
+        """Test that an entry keeps its new metadata until it is written."""
+        with PasswordStoreService(password_store) as store:
+            store.writer._delay = 60
+            store.scan()
+            store.fill_metadata()
+            store.save_password(
+                Password("vpn", Path("work/vpn"), "new", username="new")
+            )
+            store.scan()
+            assert subtitles(store)["work/vpn"] == "new"
+            store.metadata.save()
+            store.writer.flush()
+
+            assert store.metadata.subtitle("work/vpn") == "new"
+            assert store.metadata._files["work/vpn"][1] is not None
+
+    def test_unreadable_cache(self, password_store):
+        """Test that a cache that cannot be decrypted is rebuilt."""
+        metadata = MetadataCache(password_store)
+        metadata.path.parent.mkdir(parents=True)
+        metadata.path.write_bytes(b"garbage")
+
+        with PasswordStoreService(password_store) as store:
+            store.scan()
+            store.fill_metadata()
+            assert subtitles(store)["personal/bank"] == "me"
+
+    def test_encrypted_to_own_key(self, password_store):
+        """Test that the cache does not depend on the store's recipients."""
+        (password_store / ".gpg-id").unlink()
+        with PasswordStoreService(password_store) as store:
+            store.scan()
+            store.fill_metadata()
+
+        metadata = MetadataCache(password_store)
+        metadata.load()
+        assert metadata.subtitle("personal/bank") == "me"
+
+    def test_multi_store(self, password_store):
+        """Test that refreshing fills subtitles into the merged index."""
+        configs = [StoreConfig("own", password_store)]
+        with MultiStoreService(configs, metadata=True) as stores:
+            stores.wait(stores.refresh())
+            assert stores.index.get("own:personal/bank").subtitle == "me"
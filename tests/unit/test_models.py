@@ -54,6 +54,21 @@ class TestPassword:
         assert data["username"] == "user"
         assert "password" not in data  # Password not in dict for security
 
+    def test_from_passwordstore_format(self):
+        """Test parsing the decrypted passwordstore file format."""
+        password = Password.from_passwordstore_format(
+            "secret\nlogin: user\nURL: https://example.com\n"
+            "otpauth://totp/x?secret=ABC\nsome note\n",
+            name="Test",
+            path=Path("test"),
+        )
+
+        assert password.password == "secret"
+        assert password.username == "user"
+        assert password.url == "https://example.com"
+        assert password.otp_secret == "otpauth://totp/x?secret=ABC"
+        assert password.notes == "some note"
+
 
 @pytest.mark.unit
 class TestPasswordEntry:
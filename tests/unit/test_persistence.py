@@ -0,0 +1,165 @@
+"""Unit tests for the write-behind persistence service."""
+
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from gtkpass.models.password import Password
+from gtkpass.services.git import GitError, GitService
+from gtkpass.services.gpg import GPGError
+from gtkpass.services.persistence import WriteBehindService, combined_message
+from gtkpass.services.store import PasswordStoreService
+
+
+@pytest.fixture
+def repository(tmp_path, git_identity):
+    """Provide an empty git repository."""
+    subprocess.run(["git", "init", "--quiet", str(tmp_path)], check=True)
+    return tmp_path
+
+
+def log(repository):
+    """Return the full commit messages of the repository, newest first."""
+    return GitService(repository).run("log", "--format=%B%x00").split("\0\n")[:-1]
+
+
+@pytest.mark.unit
+class TestWriteBehindService:
+    """Test cases for WriteBehindService."""
+
+    def test_changes_are_batched_into_one_commit(self, repository):
+        """Test that changes within the window become a single commit."""
+        with WriteBehindService(repository, GitService(repository), delay=60) as w:
+            w.write("a.gpg", b"a", "Add a")
+            w.write("dir/b.gpg", b"b", "Add b")
+            w.write("a.gpg", b"a2", "Edit a")
+            assert not (repository / "a.gpg").exists()
+            assert w.pending() == {"a.gpg": b"a2", "dir/b.gpg": b"b"}
+
+        assert (repository / "a.gpg").read_bytes() == b"a2"
+        assert (repository / "dir" / "b.gpg").read_bytes() == b"b"
+        assert log(repository) == ["Update 3 entries\n\n- Add a\n- Add b\n- Edit a\n"]
+        assert not list(repository.rglob("*.tmp"))
+
+    def test_flush_after_delay(self, repository):
+        """Test that a batch is written once the window has passed."""
+        with WriteBehindService(repository, GitService(repository), delay=0.05) as w:
+            w.write("a.gpg", b"a", "Add a")
+            deadline = time.monotonic() + 5
+            while w.pending() and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert (repository / "a.gpg").read_bytes() == b"a"
+            assert log(repository) == ["Add a\n"]
+
+    def test_delete(self, repository):
+        """Test that deletions are persisted and committed."""
+        with WriteBehindService(repository, GitService(repository)) as writer:
+            writer.write("a.gpg", b"a", "Add a")
+            writer.flush()
+            writer.delete("a.gpg", "Remove a")
+
+        assert not (repository / "a.gpg").exists()
+        assert log(repository) == ["Remove a\n", "Add a\n"]
+
+    def test_delete_missing(self, repository):
+        """Test that deleting files that do not exist is a no-op."""
+        with WriteBehindService(repository, GitService(repository)) as writer:
+            writer.write("a.gpg", b"a", "Add a")
+            writer.delete("foo/bar.gpg", "Remove foo/bar")
+            writer.write("new/b.gpg", b"b", "Add new/b")
+            writer.delete("new/b.gpg", "Remove new/b")
+            writer.flush()
+            assert writer.pending() == {}
+
+        assert (repository / "a.gpg").read_bytes() == b"a"
+        assert not (repository / "new" / "b.gpg").exists()
+        assert GitService(repository).run("ls-files").split() == ["a.gpg"]
+
+    def test_failed_commit_is_retried(self, repository):
+        """Test that a batch whose commit failed is committed with the next."""
+        git = GitService(repository)
+        commit = git.commit
+        git.commit = lambda message, paths: (_ for _ in ()).throw(GitError("busy"))
+        with WriteBehindService(repository, git, delay=60) as writer:
+            writer.write("a.gpg", b"a", "Add a")
+            with pytest.raises(GitError):
+                writer.flush()
+            assert writer.pending() == {}
+            git.commit = commit
+            writer.write("b.gpg", b"b", "Add b")
+
+        assert log(repository) == ["Update 2 entries\n\n- Add a\n- Add b\n"]
+
+    def test_without_git(self, tmp_path):
+        """Test that stores without git are only written."""
+        with WriteBehindService(tmp_path, GitService(tmp_path)) as writer:
+            writer.write("a.gpg", b"a", "Add a")
+
+        assert (tmp_path / "a.gpg").read_bytes() == b"a"
+
+    def test_failed_batch_is_requeued(self, tmp_path):
+        """Test that a batch that cannot be written is kept."""
+        (tmp_path / "blocker").write_text("a file, not a directory")
+        writer = WriteBehindService(tmp_path, delay=60)
+        with writer:
+            writer.write("blocker/a.gpg", b"a", "Add a")
+            with pytest.raises(OSError):
+                writer.flush()
+            assert writer.pending() == {"blocker/a.gpg": b"a"}
+            (tmp_path / "blocker").unlink()
+
+        assert (tmp_path / "blocker" / "a.gpg").read_bytes() == b"a"
+
+    def test_write_without_context(self, tmp_path):
+        """Test that writing without the context manager raises an error."""
+        with pytest.raises(RuntimeError, match="not initialized"):
+            WriteBehindService(tmp_path).write("a.gpg", b"a", "Add a")
+
+    def test_combined_message(self):
+        """Test folding commit messages."""
+        assert combined_message(["Edit a", "Edit a"]) == "Edit a"
+        assert combined_message(["Edit a", "Edit b"]) == (
+            "Update 2 entries\n\n- Edit a\n- Edit b"
+        )
+
+
+@pytest.mark.unit
+class TestStoreWriting:
+    """Test writing entries through the password store service."""
+
+    def test_save_and_read_back(self, password_store, git_identity):
+        """Test that saved entries are readable before and after the flush."""
+        subprocess.run(["git", "init", "--quiet", str(password_store)], check=True)
+        GitService(password_store).commit("Initial store", ["."])
+        store = PasswordStoreService(password_store)
+        with store:
+            store.save_password(
+                Password(name="new", path=Path("x/new"), password="pw", username="me")
+            )
+            assert store.get_password("x/new").username == "me"
+            assert "x/new" in store.index
+            store.delete_password("work/vpn")
+            with pytest.raises(FileNotFoundError):
+                store.get_password("work/vpn")
+
+        assert store.get_password("x/new").password == "pw"
+        assert not store.file_path("work/vpn").exists()
+        assert log(password_store)[0] == (
+            "Update 2 entries\n\n"
+            "- Edit password for x/new using GTKPass.\n"
+            "- Remove work/vpn from store.\n"
+        )
+
+    def test_save_with_missing_recipient_key(self, password_store):
+        """Test that saving fails instead of leaving out a recipient."""
+        gpg_id = password_store / ".gpg-id"
+        gpg_id.write_text(gpg_id.read_text() + "teammate@example.com\n")
+        with PasswordStoreService(password_store) as store:
+            with pytest.raises(GPGError, match="teammate@example.com"):
+                store.save_password(
+                    Password(name="new", path=Path("new"), password="pw")
+                )
+            assert store.writer.pending() == {}
@@ -0,0 +1,190 @@
+"""Unit tests for the recipient resolution service."""
+
+from pathlib import Path
+
+import pytest
+
+from gtkpass.models.key import GPGKey
+from gtkpass.services.gpg import GPGError, parse_colons
+from gtkpass.services.recipients import RecipientService
+
+LISTING = "\n".join(
+    [
+        "tru::1:1792363985:0:3:1:5",
+        "pub:u:255:22:63A7029261710290:1792363983:::u:::scESC::::::ed25519:::0:",
+        "fpr:::::::::712CEE0921DC33AC5AFCED0F63A7029261710290:",
+        "uid:u::::1792363983::03DC22E9F897D3AE136C29CF64B7901137DAC1A2::"
+        "Alice <alice@example.com>::::::::::0:",
+        "sub:u:255:18:6B9CA75F6316DC38:1792363983::::::e::::::cv25519::",
+        "fpr:::::::::77793C01135F5DBB760F7AF66B9CA75F6316DC38:",
+    ]
+)
+
+ALICE = "712CEE0921DC33AC5AFCED0F63A7029261710290"
+
+
+class FakeGPG:
+    """GPG stand-in answering key listings from a fixed colon listing."""
+
+    def __init__(self, homedir=Path("/nonexistent")):
+        self.homedir = homedir
+        self.calls = []
+
+    def list_keys(self, *specs):
+        self.calls.append(specs)
+        return parse_colons(LISTING)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Provide a store with nested .gpg-id files."""
+    (tmp_path / ".gpg-id").write_text("alice@example.com\n")
+    (tmp_path / "work" / "team").mkdir(parents=True)
+    (tmp_path / "work" / "team" / ".gpg-id").write_text(
+        "# team keys\n0x63A7029261710290\nbob@example.com\n"
+    )
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / ".gpg-id").write_text("ignored\n")
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestGPGKey:
+    """Test cases for parsing and matching keys."""
+
+    def test_parse_colons(self):
+        """Test parsing a colon listing."""
+        (key,) = parse_colons(LISTING)
+
+        assert key.fingerprint == ALICE
+        assert key.key_id == "63A7029261710290"
+        assert key.uids == ["Alice <alice@example.com>"]
+        assert key.subkeys == ["77793C01135F5DBB760F7AF66B9CA75F6316DC38"]
+
+    @pytest.mark.parametrize(
+        "spec",
+        [
+            ALICE,
+            "0x63A7029261710290",
+            "61710290!",
+            "6316DC38",
+            "alice@example.com",
+            "<ALICE@example.com>",
+            "Alice",
+        ],
+    )
+    def test_matches(self, spec):
+        """Test the recipient specifications gpg accepts."""
+        (key,) = parse_colons(LISTING)
+        assert key.matches(spec)
+
+    def test_does_not_match(self):
+        """Test that other recipients do not match."""
+        key = GPGKey(fingerprint=ALICE, key_id="63A7029261710290", uids=["Alice"])
+        assert not key.matches("bob@example.com")
+        assert not key.matches("DEADBEEF")
+
+
+@pytest.mark.unit
+class TestRecipientService:
+    """Test cases for RecipientService."""
+
+    def test_recipients_for(self, store):
+        """Test that the nearest .gpg-id applies."""
+        service = RecipientService(store, FakeGPG())
+
+        assert service.recipients_for("github") == ("alice@example.com",)
+        assert service.recipients_for("work/vpn") == ("alice@example.com",)
+        assert service.recipients_for("work/team/db/prod") == (
+            "0x63A7029261710290",
+            "bob@example.com",
+        )
+        assert service.gpg_id_directory("work/team/db/prod") == "work/team"
+        assert set(service.tree()) == {"", "work/team"}
+
+    def test_tree_is_read_once(self, store, monkeypatch):
+        """Test that lookups are answered from memory."""
+        service = RecipientService(store, FakeGPG())
+        service.recipients_for("a/b/c")
+        monkeypatch.setattr(
+            service, "_read_gpg_id", lambda d: pytest.fail(f"re-read {d}")
+        )
+
+        for path in ["x", "a/b/d", "work/team/x", "work/team/y/z"]:
+            service.recipients_for(path)
+
+    def test_resolve_in_one_batch(self, store):
+        """Test that all recipients are resolved with a single gpg call."""
+        gpg = FakeGPG()
+        service = RecipientService(store, gpg)
+
+        assert service.fingerprints_for("github") == [ALICE]
+        assert service.resolve()["bob@example.com"] is None
+        assert gpg.calls == [
+            ("0x63A7029261710290", "alice@example.com", "bob@example.com")
+        ]
+
+    def test_missing_key(self, store):
+        """Test that files are never encrypted to a subset of recipients."""
+        service = RecipientService(store, FakeGPG())
+
+        with pytest.raises(GPGError, match="bob@example.com"):
+            service.fingerprints_for("work/team/db")
+
+    def test_keyring_change(self, store, tmp_path):
+        """Test that recipients are resolved again after the keyring changed."""
+        home = tmp_path / "gnupg"
+        home.mkdir()
+        gpg = FakeGPG(home)
+        service = RecipientService(store, gpg)
+        service.fingerprints_for("github")
+        service.fingerprints_for("github")
+        assert len(gpg.calls) == 1
+
+        (home / "pubring.kbx").write_bytes(b"new key")
+        service.fingerprints_for("github")
+        assert len(gpg.calls) == 2
+
+    def test_invalidate_subtree(self, store, monkeypatch):
+        """Test that only the changed subtree is reloaded."""
+        service = RecipientService(store, FakeGPG())
+        service.recipients_for("work/team/db")
+        service.recipients_for("personal/bank")
+        (store / "work" / "team" / ".gpg-id").write_text("carol@example.com\n")
+        (store / "work" / "team" / "db").mkdir()
+        (store / "work" / "team" / "db" / ".gpg-id").write_text("dave\n")
+
+        read = []
+        original = service._read_gpg_id
+        monkeypatch.setattr(
+            service, "_read_gpg_id", lambda d: read.append(d) or original(d)
+        )
+        service.invalidate("work/team")
+
+        assert sorted(read) == ["work/team", "work/team/db"]
+        assert service.recipients_for("work/team/x") == ("carol@example.com",)
+        assert service.recipients_for("work/team/db/prod") == ("dave",)
+        assert service.recipients_for("personal/bank") == ("alice@example.com",)
+
+    def test_removed_gpg_id(self, store):
+        """Test that removing a .gpg-id falls back to the parent directory."""
+        service = RecipientService(store, FakeGPG())
+        service.recipients_for("work/team/x")
+        (store / "work" / "team" / ".gpg-id").unlink()
+        service.invalidate("work/team")
+
+        assert service.recipients_for("work/team/x") == ("alice@example.com",)
+
+    def test_store_without_gpg_id(self, tmp_path):
+        """Test a store without any .gpg-id."""
+        service = RecipientService(tmp_path, FakeGPG())
+
+        assert service.gpg_id_directory("a/b") is None
+        assert service.recipients_for("a/b") == ()
+
+    def test_real_gpg(self, password_store, gpg_home):
+        """Test resolving against a real keyring."""
+        home, fingerprint = gpg_home
+        service = RecipientService(password_store)
+
+        assert service.fingerprints_for("work/github") == [fingerprint]
@@ -0,0 +1,105 @@
+"""Unit tests for the password store service."""
+
+from pathlib import Path
+
+import pytest
+
+from gtkpass.services.store import PasswordStoreService, default_store_path
+
+
+@pytest.fixture
+def plain_store(tmp_path):
+    """Provide a store layout with dummy (unencrypted) password files."""
+    for path in ["work/github", "work/vpn", "personal/bank", "email"]:
+        target = tmp_path / f"{path}.gpg"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(b"")
+    (tmp_path / ".gpg-id").write_text("ABCDEF\n")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "ignored.gpg").write_bytes(b"")
+    (tmp_path / "README").write_text("not a password")
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestPasswordStoreService:
+    """Test cases for PasswordStoreService."""
+
+    def test_default_store_path(self, monkeypatch, tmp_path):
+        """Test that PASSWORD_STORE_DIR overrides the default location."""
+        monkeypatch.setenv("PASSWORD_STORE_DIR", str(tmp_path))
+        assert default_store_path() == tmp_path
+
+        monkeypatch.delenv("PASSWORD_STORE_DIR")
+        assert default_store_path() == Path.home() / ".password-store"
+
+    def test_list_passwords(self, plain_store):
+        """Test that only password files outside hidden directories are listed."""
+        with PasswordStoreService(plain_store) as store:
+            paths = [entry.path.as_posix() for entry in store.list_passwords()]
+
+        assert paths == ["email", "personal/bank", "work/github", "work/vpn"]
+
+    def test_entry_names(self, plain_store):
+        """Test that entries are named after the last path component."""
+        store = PasswordStoreService(plain_store)
+        names = {entry.name for entry in store.list_passwords()}
+
+        assert names == {"email", "bank", "github", "vpn"}
+
+    def test_search(self, plain_store):
+        """Test that all search terms must match."""
+        store = PasswordStoreService(plain_store)
+
+        assert [e.path.as_posix() for e in store.search("work")] == [
+            "work/github",
+            "work/vpn",
+        ]
+        assert [e.path.as_posix() for e in store.search("WORK git")] == ["work/github"]
+        assert store.search("nothing") == []
+
+    def test_missing_store(self, tmp_path):
+        """Test that a missing store directory lists no entries."""
+        store = PasswordStoreService(tmp_path / "missing")
+        assert store.list_passwords() == []
+
+    def test_get_password(self, password_store):
+        """Test decrypting and parsing an entry."""
+        store = PasswordStoreService(password_store)
+        password = store.get_password("work/github")
+
+        assert password.name == "github"
+        assert password.password == "s3cret"
+        assert password.username == "octocat"
+        assert password.url == "https://github.com"
+
+    def test_warm(self, password_store, monkeypatch):
+        """Test that warmed entries are decrypted without reading the file."""
+        store = PasswordStoreService(password_store)
+        store.warm(["work/github", "missing"])
+        store.scan()
+        decrypt_file = store._gpg.decrypt_file
+        monkeypatch.setattr(store._gpg, "decrypt_file", lambda path: pytest.fail())
+
+        assert store.get_password("work/github").password == "s3cret"
+        monkeypatch.setattr(store._gpg, "decrypt_file", decrypt_file)
+        with pytest.raises(FileNotFoundError):
+            store.get_password("missing")
+
+    def test_warm_outdated(self, password_store):
+        """Test that warmed copies of files changed elsewhere are not used."""
+        store = PasswordStoreService(password_store)
+        store.warm(["work/github", "work/vpn"])
+        github = store.file_path("work/github")
+        github.write_bytes(store.file_path("personal/bank").read_bytes())
+        store.file_path("work/vpn").unlink()
+
+        assert store.get_password("work/github").password == "hunter2"
+        with pytest.raises(FileNotFoundError):
+            store.get_password("work/vpn")
+
+    def test_get_missing_password(self, tmp_path):
+        """Test that a missing entry raises FileNotFoundError."""
+        store = PasswordStoreService(tmp_path)
+        with pytest.raises(FileNotFoundError):
+            store.get_password("missing")
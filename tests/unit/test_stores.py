@@ -0,0 +1,199 @@
+"""Unit tests for the multi-store service."""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from gtkpass.models.password import Password
+from gtkpass.services.stores import (
+    MultiStoreService,
+    StoreConfig,
+    load_store_configs,
+)
+
+
+def make_store(root: Path, *paths: str) -> Path:
+    """Create a store layout with dummy password files."""
+    for path in paths:
+        target = root / f"{path}.gpg"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(b"")
+    return root
+
+
+@pytest.fixture
+def two_stores(tmp_path):
+    """Provide the configurations of a personal and a team store."""
+    return [
+        StoreConfig("personal", make_store(tmp_path / "p", "github", "bank")),
+        StoreConfig("team", make_store(tmp_path / "t", "github", "ops/vpn")),
+    ]
+
+
+@pytest.mark.unit
+class TestLoadStoreConfigs:
+    """Test cases for load_store_configs."""
+
+    def test_config_file(self, tmp_path, monkeypatch):
+        """Test that every section with a path is a store, in file order."""
+        monkeypatch.delenv("PASSWORD_STORE_DIR", raising=False)
+        config = tmp_path / "stores.ini"
+        config.write_text(
+            "[team]\npath = /srv/team\n\n[personal]\npath = ~/store\n\n[empty]\n"
+        )
+
+        assert load_store_configs(config) == [
+            StoreConfig("team", Path("/srv/team")),
+            StoreConfig("personal", Path.home() / "store"),
+        ]
+
+    def test_environment_takes_precedence(self, tmp_path, monkeypatch):
+        """Test that PASSWORD_STORE_DIR selects a single unnamed store."""
+        monkeypatch.setenv("PASSWORD_STORE_DIR", str(tmp_path))
+        config = tmp_path / "stores.ini"
+        config.write_text("[team]\npath = /srv/team\n")
+
+        assert load_store_configs(config) == [StoreConfig(None, tmp_path)]
+
+    def test_default_store(self, tmp_path, monkeypatch):
+        """Test the fallback without any configuration."""
+        monkeypatch.delenv("PASSWORD_STORE_DIR", raising=False)
+
+        assert load_store_configs(tmp_path / "missing.ini") == [
+            StoreConfig(None, Path.home() / ".password-store")
+        ]
+
+
+@pytest.mark.unit
+class TestMultiStoreService:
+    """Test cases for MultiStoreService."""
+
+    def test_merged_index(self, two_stores):
+        """Test that all stores are merged with store-qualified paths."""
+        with MultiStoreService(two_stores) as stores:
+            stores.wait(stores.refresh())
+
+        assert stores.index.search([]) == [
+            "personal:bank",
+            "personal:github",
+            "team:github",
+            "team:ops/vpn",
+        ]
+        assert stores.index.search(["team", "git"]) == ["team:github"]
+
+    def test_refresh_single_store(self, two_stores):
+        """Test that refreshing one store leaves the others untouched."""
+        with MultiStoreService(two_stores) as stores:
+            stores.wait(stores.refresh())
+            (two_stores[1].path / "github.gpg").unlink()
+            make_store(two_stores[0].path, "new")
+            stores.wait(stores.refresh("team"))
+
+        assert stores.index.search([]) == [
+            "personal:bank",
+            "personal:github",
+            "team:ops/vpn",
+        ]
+
+    def test_slow_store_does_not_block(self, two_stores):
+        """Test that a blocked store scan does not delay the other stores."""
+        started, release = threading.Event(), threading.Event()
+        with MultiStoreService(two_stores) as stores:
+            team = stores.stores["team"]
+            scan = team.scan
+            team.scan = lambda: started.set() or release.wait(timeout=5) and scan()
+            slow, fast = stores.refresh("team", "personal")
+
+            fast.result(timeout=1)
+            assert started.wait(timeout=1)
+            assert not slow.done()
+            assert stores.index.search([]) == ["personal:bank", "personal:github"]
+            release.set()
+
+        assert len(stores.index) == 4
+
+    def test_refresh_during_scan(self, two_stores):
+        """Test that only refreshes that have not started are coalesced."""
+        started, release = threading.Event(), threading.Event()
+        with MultiStoreService(two_stores) as stores:
+            team = stores.stores["team"]
+            scan = team.scan
+            team.scan = lambda: started.set() or release.wait(timeout=5) and scan()
+            (running,) = stores.refresh("team")
+            assert started.wait(timeout=1)
+
+            queued = stores.refresh("team")
+            assert queued != [running]
+            assert stores.refresh("team") == queued
+            make_store(two_stores[1].path, "new")
+            release.set()
+            stores.wait(queued)
+
+        assert "team:new" in stores.index
+
+    def test_listener(self, two_stores):
+        """Test that listeners are told which store was merged."""
+        refreshed = []
+        with MultiStoreService(two_stores) as stores:
+            stores.add_listener(refreshed.append)
+            stores.wait(stores.refresh())
+
+        assert sorted(refreshed) == ["personal", "team"]
+
+    def test_write_unqualified_path(self, password_store, two_stores):
+        """Test that unqualified paths are written to the primary store."""
+        password = Password(name="new", path=Path("elsewhere"), password="pw")
+        configs = [StoreConfig("personal", password_store), two_stores[1]]
+        with MultiStoreService(configs) as stores:
+            stores.save_password("work/new", password)
+            assert password.path == Path("elsewhere")
+            assert "personal:work/new" in stores.index
+            assert stores.get_password("personal:work/new").password == "pw"
+
+            stores.delete_password("work/new")
+            assert "personal:work/new" not in stores.index
+
+    def test_refresh_keeps_queued_changes(self, password_store):
+        """Test that a refresh before the flush keeps queued writes."""
+        with MultiStoreService([StoreConfig(None, password_store)]) as stores:
+            stores.primary.writer._delay = 60
+            stores.wait(stores.refresh())
+            password = Password(name="site", path=Path("web/site"), password="pw")
+            stores.save_password("web/site", password)
+            stores.delete_password("work/vpn")
+            stores.wait(stores.refresh())
+
+            assert "web/site" in stores.index
+            assert "work/vpn" not in stores.index
+
+    def test_exit_closes_every_store(self, two_stores):
+        """Test that a failing store does not keep the others from flushing."""
+        stores = MultiStoreService(two_stores)
+        with pytest.raises(OSError, match="disk full"):
+            with stores:
+                personal = stores.stores["personal"]
+                personal.writer.flush = lambda: (_ for _ in ()).throw(
+                    OSError("disk full")
+                )
+                team = stores.stores["team"]
+                team.writer.write("new.gpg", b"new", "Add new")
+
+        assert (two_stores[1].path / "new.gpg").read_bytes() == b"new"
+
+    def test_resolve(self, two_stores):
+        """Test that unqualified paths refer to the primary store."""
+        stores = MultiStoreService(two_stores)
+
+        assert stores.resolve("team:ops/vpn") == (stores.stores["team"], "ops/vpn")
+        assert stores.resolve("github") == (stores.stores["personal"], "github")
+        assert stores.resolve("odd:name") == (stores.stores["personal"], "odd:name")
+
+    def test_qualify(self, two_stores, tmp_path):
+        """Test that paths are turned into index keys."""
+        stores = MultiStoreService(two_stores)
+
+        assert stores.qualify("work/github") == "personal:work/github"
+        assert stores.qualify("team:ops/vpn") == "team:ops/vpn"
+        unnamed = MultiStoreService([StoreConfig(None, tmp_path)])
+        assert unnamed.qualify("work/github") == "work/github"
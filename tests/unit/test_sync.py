@@ -0,0 +1,142 @@
+"""Unit tests for the git sync service."""
+
+import subprocess
+import threading
+from pathlib import Path
+
+import pytest
+
+from gtkpass.services.store import PasswordStoreService
+from gtkpass.services.stores import MultiStoreService, StoreConfig
+from gtkpass.services.sync import SyncService, parse_name_status
+
+
+def git(repository: Path, *args: str) -> None:
+    """Run git in a repository."""
+    subprocess.run(
+        ["git", "-C", str(repository), *args], check=True, capture_output=True
+    )
+
+
+def commit(repository: Path, files: dict[str, bytes | None], message: str) -> None:
+    """Write (or delete, for None) files and commit them."""
+    for path, data in files.items():
+        target = repository / path
+        if data is None:
+            target.unlink()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+    git(repository, "add", "--all")
+    git(repository, "commit", "--quiet", "--message", message)
+
+
+@pytest.fixture
+def remote(tmp_path, git_identity):
+    """Provide a repository with a few dummy entries to pull from."""
+    origin = tmp_path / "origin"
+    git(tmp_path, "init", "--quiet", str(origin))
+    commit(
+        origin,
+        {"a.gpg": b"a", "b.gpg": b"b", "team/.gpg-id": b"ABCDEF\n"},
+        "Initial",
+    )
+    return origin
+
+
+@pytest.fixture
+def clone(tmp_path, remote):
+    """Provide a store cloned from the remote."""
+    store = tmp_path / "store"
+    git(tmp_path, "clone", "--quiet", str(remote), str(store))
+    git(store, "config", "pull.rebase", "true")
+    return store
+
+
+@pytest.mark.unit
+class TestSyncService:
+    """Test cases for SyncService."""
+
+    def test_parse_name_status(self):
+        """Test that deletions are told apart from other changes."""
+        assert parse_name_status("M\0a.gpg\0D\0b b.gpg\0A\0c.gpg\0") == (
+            ["a.gpg", "c.gpg"],
+            ["b b.gpg"],
+        )
+        assert parse_name_status("") == ([], [])
+
+    def test_incremental_pull(self, remote, clone, monkeypatch):
+        """Test that only the changed files are applied to the index."""
+        with PasswordStoreService(clone) as store:
+            store.scan()
+            store.recipients.tree()
+            monkeypatch.setattr(store, "scan", lambda: pytest.fail("rescanned"))
+            commit(
+                remote,
+                {
+                    "a.gpg": b"a2",
+                    "b.gpg": None,
+                    "team/c.gpg": b"c",
+                    ".hidden/d.gpg": b"d",
+                    "team/.gpg-id": b"FEDCBA\n",
+                },
+                "Remote changes",
+            )
+
+            result = SyncService(store).pull()
+
+            assert result.updated and not result.rescanned
+            assert result.changed == ["a", "team/c"]
+            assert result.removed == ["b"]
+            assert store.index.search([]) == ["a", "team/c"]
+            assert store.recipients.recipients_for("team/c") == ("FEDCBA",)
+
+    def test_nothing_to_pull(self, clone):
+        """Test that an up to date store is left alone."""
+        with PasswordStoreService(clone) as store:
+            result = SyncService(store).pull()
+
+        assert not result.updated
+        assert result.changed == result.removed == []
+
+    def test_rewritten_history(self, remote, clone):
+        """Test that the store is rescanned when local commits were rebased."""
+        commit(remote, {"c.gpg": b"c"}, "Remote change")
+        with PasswordStoreService(clone) as store:
+            store.scan()
+            commit(clone, {"local.gpg": b"l"}, "Local change")
+
+            result = SyncService(store).pull()
+
+            assert result.rescanned
+            assert store.index.search([]) == ["a", "b", "c", "local"]
+
+    def test_multi_store_sync(self, remote, clone):
+        """Test that pulled changes are merged into the multi-store index."""
+        with MultiStoreService([StoreConfig("team", clone)]) as stores:
+            stores.wait(stores.refresh())
+            commit(remote, {"b.gpg": None, "c.gpg": b"c"}, "Remote changes")
+
+            (future,) = stores.sync()
+
+            assert future.result().changed == ["c"]
+            assert stores.index.search([]) == ["team:a", "team:c"]
+
+    def test_serialized_with_refresh(self, remote, clone):
+        """Test that pulls of a store wait for its scan and are not doubled."""
+        release = threading.Event()
+        with MultiStoreService([StoreConfig("team", clone)]) as stores:
+            store = stores.stores["team"]
+            scan = store.scan
+            store.scan = lambda: release.wait(timeout=5) and scan()
+            (refresh,) = stores.refresh()
+            commit(remote, {"c.gpg": b"c"}, "Remote change")
+            (first,) = stores.sync()
+            (second,) = stores.sync()
+
+            assert first is second
+            assert not first.done()
+            release.set()
+            assert first.result(timeout=5).changed == ["c"]
+            assert refresh.done()
+            assert stores.index.search([]) == ["team:a", "team:b", "team:c"]